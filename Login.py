@@ -1,5 +1,6 @@
 import streamlit as st
 import time
+from fraudriskscore_final import registry, releases
 
 st.set_page_config(
     page_title="Login",
@@ -12,6 +13,14 @@ st.set_page_config(
     }
 )
 
+@st.cache_resource
+def start_model_warmup():
+    # Start loading the models while the user signs in, and watch for new releases (once per server process).
+    releases.watch()
+    return registry.warm_in_background()
+
+start_model_warmup()
+
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "username" not in st.session_state:
@@ -0,0 +1,223 @@
+import os
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from claim_features import engineer_features
+from fraudriskscore_final import score_batch
+
+# Rows read (and scored) per chunk when streaming a batch file.
+READ_CHUNK_ROWS = int(os.environ.get("FRAUD_READ_CHUNK_ROWS", "10000"))
+
+# Scored rows kept in memory for the on-screen preview.
+PREVIEW_ROWS = 1000
+
+# Batch file formats: CSV, Parquet and Arrow IPC (the last two need pyarrow).
+FORMATS = ("csv", "parquet", "arrow")
+_EXTENSIONS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+               ".arrow": "arrow", ".arrows": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+# Columns added by process_claims_batch; key-column output keeps only these plus the chosen keys.
+RESULT_COLUMNS = ["Fraud Risk Score (%)", "Risk Level", "Decision", "Text Suspicion Score (%)", "Model Version"]
+DEFAULT_KEY_COLUMNS = ("policy_number",)
+
+Source = Union[str, IO[bytes]]
+
+
+# --- BATCH PROCESSING FUNCTION ---
+
+def process_claims_batch(df_claims: pd.DataFrame) -> pd.DataFrame:
+    """Processes a DataFrame of claims with the vectorized ensemble (score_batch)."""
+    # 1. Engineered features (ratios, flags, daysdiff), computed column-wise
+    df_claims = engineer_features(df_claims)
+
+    # 2. Score all claims in chunks
+    scores = score_batch(df_claims, engineer=False)
+
+    # Join the results onto the claim data by position (engineer_features returned our own copy)
+    df_results = df_claims
+    df_results.index = pd.RangeIndex(len(df_results))
+    df_results["Fraud Risk Score (%)"] = scores["fraud_risk_score"].to_numpy() * 100
+    df_results["Risk Level"] = scores["risk_level"].array
+    df_results["Decision"] = _decisions(scores)
+    df_results["Text Suspicion Score (%)"] = scores["text_suspicion_score"].to_numpy() * 100
+    # One release scores the whole frame (a streamed file may span a release swap, chunk by chunk).
+    df_results["Model Version"] = pd.Categorical.from_codes(np.zeros(len(df_results), dtype=np.int8),
+                                                            categories=[scores.attrs["model_version"]])
+
+    return df_results
+
+def _decisions(scores: pd.DataFrame) -> pd.Categorical:
+    """Decision categorical; failed rows get "Prediction Failed: <error>..." as their own categories."""
+    decisions = scores["decision"].array
+    failed = (scores["risk_level"] == "ERROR").to_numpy()
+    if not failed.any():
+        return decisions
+    messages = np.array(["Prediction Failed: " + str(e or "")[:50] + "..." for e in scores["error"].to_numpy()[failed]],
+                        dtype=object)
+    decisions = decisions.add_categories(pd.unique(messages))
+    decisions[failed] = messages
+    return decisions
+
+def add_risk_level_counts(counts: Dict[str, int], df_results: pd.DataFrame) -> None:
+    """Adds the rows per Risk Level of a scored chunk to counts (levels without rows are skipped)."""
+    for level, n in df_results["Risk Level"].value_counts(sort=False).items():
+        if n:
+            counts[level] = counts.get(level, 0) + int(n)
+
+
+def select_output_columns(df_results: pd.DataFrame, key_columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """All columns, or only key_columns (those present) followed by the score columns."""
+    if key_columns is None:
+        return df_results
+    keys = [c for c in key_columns if c in df_results.columns and c not in RESULT_COLUMNS]
+    return df_results[keys + RESULT_COLUMNS]
+
+
+# --- FORMATS (CSV / Parquet / Arrow IPC) ---
+
+def detect_format(name: Optional[str], default: str = "csv") -> str:
+    """Batch format from a file name's extension (default when unknown)."""
+    return _EXTENSIONS.get(os.path.splitext(name or "")[1].lower(), default)
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc, pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow batch files need pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+def _batch_to_pandas(batch: Any) -> pd.DataFrame:
+    # Dates become "YYYY-MM-DD" strings, the form the models saw in the training CSVs.
+    pa = _pyarrow()
+    columns = [c.cast(pa.string()) if pa.types.is_date(c.type) else c for c in batch.columns]
+    return pa.Table.from_arrays(columns, names=batch.schema.names).to_pandas()
+
+def _iter_record_batches(handle: IO[bytes], fmt: str, chunksize: int) -> Iterator[Tuple[Any, Optional[float]]]:
+    """(record batch, fraction read or None) of a Parquet or Arrow IPC (file or stream) source, one batch at a time."""
+    pa = _pyarrow()
+    if fmt == "parquet":
+        parquet = pa.parquet.ParquetFile(handle)
+        total, rows = parquet.metadata.num_rows, 0
+        for batch in parquet.iter_batches(batch_size=chunksize):
+            rows += batch.num_rows
+            yield batch, min(rows / total, 1.0) if total else None
+        return
+    try:
+        reader = pa.ipc.open_file(handle)
+    except pa.ArrowInvalid:
+        handle.seek(0)
+        for batch in pa.ipc.open_stream(handle):
+            yield batch, None
+        return
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i), (i + 1) / reader.num_record_batches
+
+def iter_chunks(handle: IO[bytes], fmt: str = "csv",
+                chunksize: int = READ_CHUNK_ROWS) -> Iterator[Tuple[pd.DataFrame, Optional[float]]]:
+    """(DataFrame of at most chunksize rows, fraction of the input read or None) for a batch file."""
+    if fmt == "csv":
+        total_bytes = _source_size(handle)
+        for chunk in iter_csv_chunks(handle, chunksize):
+            yield chunk, min(handle.tell() / total_bytes, 1.0) if total_bytes else None
+        return
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported batch format {fmt!r} (expected one of {FORMATS})")
+
+    for batch, fraction in _iter_record_batches(handle, fmt, chunksize):
+        # IPC batches keep the writer's sizes: split the large ones.
+        for start in range(0, max(batch.num_rows, 1), chunksize):
+            yield _batch_to_pandas(batch.slice(start, chunksize)), fraction
+
+def to_arrow(df: pd.DataFrame) -> Any:
+    """pyarrow Table of a scored chunk; object columns mixing types (e.g. numbers and text) become strings."""
+    pa = _pyarrow()
+    # Categoricals (Risk Level, Decision, Model Version) are written as plain strings: an IPC file cannot change dictionaries.
+    categorical = df.columns[df.dtypes == "category"]
+    if len(categorical):
+        df = df.astype({name: object for name in categorical})
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    df = df.copy()
+    for name in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[name], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[name] = df[name].astype(str).where(df[name].notna(), None)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def _common_type(types: List[Any]) -> Any:
+    pa = _pyarrow()
+    known = [t for t in dict.fromkeys(types) if not pa.types.is_null(t)]
+    if not known:
+        return pa.null()
+    if len(known) == 1:
+        return known[0]
+    if all(pa.types.is_integer(t) for t in known):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in known):
+        return pa.float64()
+    return pa.string()
+
+def unify_schemas(schemas: List[Any]) -> Any:
+    """Schema every chunk can be cast to: first-seen column order, mixed ints/floats widen, other mixes -> string."""
+    pa = _pyarrow()
+    names: Dict[str, List[Any]] = {}
+    for schema in schemas:
+        for field in schema:
+            names.setdefault(field.name, []).append(field.type)
+    return pa.schema([(name, _common_type(types)) for name, types in names.items()])
+
+def write_arrow_tables(tables: Iterable[Any], schema: Any, output_path: str, fmt: str) -> None:
+    """Writes tables (cast to schema) one by one as a Parquet or Arrow IPC file."""
+    pa = _pyarrow()
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(output_path, schema)
+    else:
+        writer = pa.ipc.new_file(output_path, schema)
+    try:
+        for table in tables:
+            columns = [table.column(f.name).cast(f.type) if f.name in table.column_names
+                       else pa.nulls(table.num_rows, f.type) for f in schema]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+    finally:
+        writer.close()
+
+def join_arrow_files(paths: List[str], output_path: str, fmt: str) -> None:
+    """Concatenates Arrow IPC chunk files (schemas unified) into one Parquet or Arrow IPC file, chunk by chunk."""
+    pa = _pyarrow()
+    schema = unify_schemas([pa.ipc.open_file(p).schema for p in paths])
+    write_arrow_tables((pa.ipc.open_file(p).read_all() for p in paths), schema, output_path, fmt)
+
+def read_preview(path: str, fmt: str, rows: int = PREVIEW_ROWS) -> pd.DataFrame:
+    """First rows of a result file."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    if fmt == "csv":
+        return pd.read_csv(path, nrows=rows)
+    parts, kept = [], 0
+    with open(path, "rb") as handle:
+        for chunk, _ in iter_chunks(handle, fmt, rows):
+            parts.append(chunk.head(rows - kept))
+            kept += len(parts[-1])
+            if kept >= rows:
+                break
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+# --- STREAMING (bounded memory) ---
+
+def _source_size(handle: IO[bytes]) -> Optional[int]:
+    try:
+        pos = handle.tell()
+        size = handle.seek(0, os.SEEK_END)
+        handle.seek(pos)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+def iter_csv_chunks(handle: IO[bytes], chunksize: int = READ_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(handle, chunksize=chunksize) as reader:
+        yield from reader
@@ -0,0 +1,362 @@
+import hashlib, json, os, shutil, socket, sqlite3, threading, time, uuid
+from typing import IO, Any, Dict, List, Optional, Sequence
+import pandas as pd
+from batch_io import (FORMATS, PREVIEW_ROWS, READ_CHUNK_ROWS, Source, add_risk_level_counts, detect_format, iter_chunks,
+                      join_arrow_files, process_claims_batch, read_preview, select_output_columns, to_arrow,
+                      write_arrow_tables)
+from fraudriskscore_final import result_cache
+from result_cache import ResultCache
+
+# --- Job queue settings (environment overrides) ---
+JOBS_DIR = os.environ.get("FRAUD_JOBS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fraud_jobs"))
+JOB_WORKERS = max(int(os.environ.get("FRAUD_JOB_WORKERS", "1")), 1)
+# Finished/failed jobs (and their result files) are deleted after this many seconds.
+JOB_RETENTION_SECONDS = float(os.environ.get("FRAUD_JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# How often the workers of a running queue delete expired jobs.
+CLEANUP_SECONDS = float(os.environ.get("FRAUD_JOB_CLEANUP_SECONDS", "600"))
+# How often idle workers look for jobs queued by other processes.
+POLL_SECONDS = 1.0
+# An upload identical to a job submitted this recently (same bytes, options and model version) reuses that job.
+REUSE_SECONDS = float(os.environ.get("FRAUD_JOB_REUSE_SECONDS", "3600"))
+# Previews and result bytes of finished jobs kept in memory (served again on Streamlit reruns).
+MEMO_BYTES = int(float(os.environ.get("FRAUD_JOB_MEMO_MB", "256")) * 1024 * 1024)
+MEMO_TTL_SECONDS = float(os.environ.get("FRAUD_JOB_MEMO_TTL", "1800"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_COLUMNS = ("id", "filename", "status", "created", "updated", "owner", "input_bytes", "progress",
+            "chunks_done", "rows_done", "risk_levels", "error", "input_format", "output_format", "key_columns",
+            "content_key")
+# Columns added after the first release of the table (added to existing databases on open).
+_ADDED_COLUMNS = {"progress": "REAL DEFAULT 0", "input_format": "TEXT DEFAULT 'csv'",
+                  "output_format": "TEXT DEFAULT 'csv'", "key_columns": "TEXT", "content_key": "TEXT"}
+
+
+def job_content_key(source: Source, input_format: str, output_format: str,
+                    key_columns: Optional[Sequence[str]] = None) -> str:
+    """sha256 of the file bytes, the job options and the model version; identical uploads share it."""
+    h = hashlib.sha256(repr((result_cache.version, input_format, output_format,
+                             None if key_columns is None else list(key_columns))).encode())
+    handle: IO[bytes] = open(source, "rb") if isinstance(source, str) else source
+    try:
+        if hasattr(handle, "seek"):
+            handle.seek(0)
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            h.update(block)
+    finally:
+        if isinstance(source, str):
+            handle.close()
+        elif hasattr(handle, "seek"):
+            handle.seek(0)
+    return h.hexdigest()
+
+def _memo_size(value: Any) -> int:
+    return len(value) if isinstance(value, bytes) else int(value.memory_usage(deep=True).sum())
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True  # another machine sharing the directory: assume it is still working
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+
+
+class JobQueue:
+    """Local, restartable queue of batch scoring jobs backed by SQLite and the filesystem.
+
+    submit() copies the uploaded CSV into the job directory and returns a job
+    ID; worker threads score it chunk by chunk (process_claims_batch) and
+    write every scored chunk to its own file before recording it in the
+    database, so a job interrupted by a crash or restart resumes after its
+    last finished chunk. When all chunks are done they are joined into
+    result.csv, which stays downloadable until the job expires. Several
+    processes may share one jobs_dir; a job is claimed by one worker at a
+    time, and jobs whose owning process died are queued again.
+    """
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, workers: int = JOB_WORKERS,
+                 chunksize: int = READ_CHUNK_ROWS, retention_seconds: float = JOB_RETENTION_SECONDS,
+                 reuse_seconds: float = REUSE_SECONDS, memo_bytes: int = MEMO_BYTES,
+                 cleanup_seconds: float = CLEANUP_SECONDS):
+        self.jobs_dir = jobs_dir
+        self.workers = max(int(workers), 1)
+        self.chunksize = int(chunksize)
+        self.retention_seconds = float(retention_seconds)
+        self.cleanup_seconds = float(cleanup_seconds)
+        self.reuse_seconds = float(reuse_seconds)
+        # ("preview", job_id, rows) -> preview frame, ("result", job_id) -> result file bytes of a finished job
+        self.memo = ResultCache(max_entries=1000, ttl_seconds=MEMO_TTL_SECONDS, max_bytes=memo_bytes,
+                                size_fn=_memo_size)
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(jobs_dir, "jobs.sqlite"), check_same_thread=False,
+                                   isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, filename TEXT, status TEXT NOT NULL, created REAL NOT NULL,"
+            " updated REAL NOT NULL, owner TEXT, input_bytes INTEGER,"
+            " chunks_done INTEGER DEFAULT 0, rows_done INTEGER DEFAULT 0, risk_levels TEXT DEFAULT '{}',"
+            " error TEXT)"
+        )
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for name, decl in _ADDED_COLUMNS.items():
+            if name not in existing:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_content_key ON jobs (content_key)")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._next_cleanup = 0.0
+
+    # --- paths ---
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _input_path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir(job_id), "input")
+
+    def _chunk_path(self, job_id: str, index: int, fmt: str) -> str:
+        # CSV results are checkpointed as CSV; Parquet/Arrow results as Arrow IPC chunks.
+        return os.path.join(self.job_dir(job_id), "chunks", f"{index:06d}.{'csv' if fmt == 'csv' else 'arrow'}")
+
+    def result_path(self, job_id: str) -> str:
+        job = self.get(job_id)
+        return os.path.join(self.job_dir(job_id), f"result.{job['output_format'] if job else 'csv'}")
+
+    # --- database helpers ---
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        self._execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    @staticmethod
+    def _row(row: tuple) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["risk_levels"] = json.loads(job["risk_levels"] or "{}")
+        job["key_columns"] = json.loads(job["key_columns"]) if job["key_columns"] else None
+        job["fraction"] = 1.0 if job["status"] == DONE else (job["progress"] or 0.0)
+        return job
+
+    # --- public API ---
+
+    def submit(self, source: Source, filename: Optional[str] = None, input_format: Optional[str] = None,
+               output_format: str = "csv", key_columns: Optional[Sequence[str]] = None,
+               content_key: Optional[str] = None) -> str:
+        """Queues a claims file (path or binary file object); returns the job ID.
+
+        input_format defaults to the file name's extension (CSV when unknown).
+        output_format is csv, parquet or arrow; with key_columns the result
+        keeps only those columns plus the scores. content_key (computed when
+        not given) is recorded so find() can match identical uploads later.
+        """
+        input_format = input_format or detect_format(filename or (source if isinstance(source, str) else None))
+        for fmt in (input_format, output_format):
+            if fmt not in FORMATS:
+                raise ValueError(f"unsupported batch format {fmt!r} (expected one of {FORMATS})")
+        if content_key is None:
+            content_key = job_content_key(source, input_format, output_format, key_columns)
+        job_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.job_dir(job_id), "chunks"))
+        tmp = self._input_path(job_id) + ".tmp"
+        if isinstance(source, str):
+            shutil.copyfile(source, tmp)
+        else:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            with open(tmp, "wb") as out:
+                shutil.copyfileobj(source, out)
+        os.replace(tmp, self._input_path(job_id))
+
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, filename, status, created, updated, input_bytes, input_format, output_format,"
+            " key_columns, content_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, filename, QUEUED, now, now, os.path.getsize(self._input_path(job_id)), input_format,
+             output_format, None if key_columns is None else json.dumps(list(key_columns)), content_key))
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def find(self, content_key: str) -> Optional[str]:
+        """Newest queued, running or finished job with this content key, if submitted within reuse_seconds."""
+        rows = self._fetch("SELECT id FROM jobs WHERE content_key = ? AND status != ? AND created >= ?"
+                           " ORDER BY created DESC LIMIT 1", (content_key, FAILED, time.time() - self.reuse_seconds))
+        return rows[0][0] if rows else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status: status, rows_done, fraction (of the input read), risk_levels, error, ..."""
+        rows = self._fetch(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return self._row(rows[0]) if rows else None
+
+    def jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self._fetch(f"SELECT {', '.join(_COLUMNS)} FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        return [self._row(r) for r in rows]
+
+    def preview(self, job_id: str, rows: int = PREVIEW_ROWS) -> pd.DataFrame:
+        """First scored rows of a finished job (memoized)."""
+        job = self.get(job_id)
+        if job is None:
+            return pd.DataFrame()
+        return self._memoized(job, ("preview", job_id, rows),
+                              lambda: read_preview(self.result_path(job_id), job["output_format"], rows))
+
+    def result_bytes(self, job_id: str) -> bytes:
+        """Contents of a finished job's result file, read once per job and memoized (Streamlit's
+        download_button needs the whole file in memory on every rerun)."""
+        def read() -> bytes:
+            with open(self.result_path(job_id), "rb") as f:
+                return f.read()
+        return self._memoized(self.get(job_id), ("result", job_id), read)
+
+    def _memoized(self, job: Optional[Dict[str, Any]], key: tuple, load: Any) -> Any:
+        # Only finished results are final; anything else is read again on every call.
+        if job is None or job["status"] != DONE:
+            return load()
+        value = self.memo.get(key)
+        if value is None:
+            value = load()
+            self.memo.put(key, value)
+        return value
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll: float = 0.2) -> Dict[str, Any]:
+        """Blocks until the job is done or failed (or timeout seconds passed); returns its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in (DONE, FAILED):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll)
+
+    def cleanup(self) -> int:
+        """Deletes finished/failed jobs older than retention_seconds; returns how many."""
+        self._next_cleanup = time.monotonic() + self.cleanup_seconds
+        cutoff = time.time() - self.retention_seconds
+        expired = [r[0] for r in self._fetch(
+            "SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, cutoff))]
+        for job_id in expired:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            self._execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(expired)
+
+    # --- workers ---
+
+    def start(self) -> None:
+        """Requeues jobs orphaned by dead processes and starts the worker threads (once)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [threading.Thread(target=self._work, name=f"batch-job-{i}", daemon=True)
+                             for i in range(self.workers)]
+        self.cleanup()
+        for job_id, owner in self._fetch("SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)):
+            if not _owner_alive(owner):
+                self._execute("UPDATE jobs SET status = ?, owner = NULL WHERE id = ? AND owner IS ?",
+                              (QUEUED, job_id, owner))
+        for thread in self._threads:
+            thread.start()
+
+    def _claim(self) -> Optional[str]:
+        owner = _owner()
+        for (job_id,) in self._fetch("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,)):
+            claimed = self._execute("UPDATE jobs SET status = ?, owner = ?, updated = ? WHERE id = ? AND status = ?",
+                                    (RUNNING, owner, time.time(), job_id, QUEUED))
+            if claimed:
+                return job_id
+        return None
+
+    def _work(self) -> None:
+        while True:
+            if time.monotonic() >= self._next_cleanup:
+                try:
+                    self.cleanup()
+                except Exception:
+                    pass  # retried after cleanup_seconds; the worker keeps running
+            job_id = self._claim()
+            if job_id is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            try:
+                self._run(job_id)
+            except Exception as e:
+                self._update(job_id, status=FAILED, owner=None, error=f"{type(e).__name__}: {e}")
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        start = job["chunks_done"]
+        rows, risk_levels = job["rows_done"], job["risk_levels"]
+        fmt = job["output_format"]
+        with open(self._input_path(job_id), "rb") as handle:
+            for i, (chunk, fraction) in enumerate(iter_chunks(handle, job["input_format"], self.chunksize)):
+                if i < start:
+                    continue  # scored before the restart
+                df_results = select_output_columns(process_claims_batch(chunk), job["key_columns"])
+                path = self._chunk_path(job_id, i, fmt)
+                if fmt == "csv":
+                    df_results.to_csv(path + ".tmp", index=False)
+                else:
+                    table = to_arrow(df_results)
+                    write_arrow_tables([table], table.schema, path + ".tmp", "arrow")
+                os.replace(path + ".tmp", path)
+
+                rows += len(df_results)
+                add_risk_level_counts(risk_levels, df_results)
+                self._update(job_id, chunks_done=i + 1, rows_done=rows, progress=fraction or 0.0,
+                             risk_levels=json.dumps(risk_levels))
+        self._finish(job_id)
+
+    def _finish(self, job_id: str) -> None:
+        """Joins the chunk files into the result file."""
+        job = self.get(job_id)
+        fmt = job["output_format"]
+        parts = [self._chunk_path(job_id, i, fmt) for i in range(job["chunks_done"])]
+        tmp = self.result_path(job_id) + ".tmp"
+        if fmt == "csv":
+            # Header from the first chunk only
+            with open(tmp, "wb") as out:
+                for i, path in enumerate(parts):
+                    with open(path, "rb") as part:
+                        if i > 0:
+                            part.readline()
+                        shutil.copyfileobj(part, out)
+        else:
+            join_arrow_files(parts, tmp, fmt)
+        os.replace(tmp, self.result_path(job_id))
+        shutil.rmtree(os.path.join(self.job_dir(job_id), "chunks"), ignore_errors=True)
+        os.remove(self._input_path(job_id))
+        self._update(job_id, status=DONE, owner=None, progress=1.0)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue (workers start on first use)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            _queue.start()
+        return _queue
@@ -0,0 +1,111 @@
+"""Per-worker memory of N scoring processes, with and without memory-mapped artifacts.
+
+    python benchmarks/bench_memory.py --workers 4 --output memory_results.json
+    python benchmarks/bench_memory.py --model-backend sklearn      # the pickled pipelines instead
+
+For each mode (FRAUD_MODEL_MMAP=1 and =0) starts --workers fresh
+interpreters, like `uvicorn --workers N` or several Streamlit servers on one
+host. Each loads every model artifact, scores a few claims and waits; the
+parent then reads /proc/<pid>/smaps_rollup (Linux). RSS counts mapped file
+pages in every process that touches them; PSS splits shared pages between
+the processes, so the PSS sum is what N workers really cost. The report gives
+per-worker RSS/PSS/shared/private MB, the registry's memory-mapped bytes per
+artifact, and the PSS saved per worker by mapping.
+
+The workers use the compiled backend (FRAUD_MODEL_BACKEND=compiled, which needs
+the .compiled.npz files of compiled_models.py export) unless --model-backend
+says otherwise: it is what mapping is for. sklearn's own trees copy their node
+arrays into private memory when loaded, so with the sklearn backend only a few
+small arrays are mapped and the saving is negligible. The MiniLM encoder is not
+mapped in either case (see README, Shared model memory); its private copy is
+part of every worker's PSS in both modes, so it does not change the saving.
+"""
+import argparse, json, os, subprocess, sys, time
+from typing import Any, Dict, List
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WORKER = """
+import json, sys, warnings
+warnings.filterwarnings("ignore")
+sys.path[:0] = [{root!r}, {bench!r}]
+import fraudriskscore_final as frs
+from bench_scoring import synthetic_claims
+errors = frs.registry.warm()
+frs.score_batch(synthetic_claims({claims}, seed=0), use_cache=False)
+report = {{r["artifact"]: {{"memory_bytes": r["memory_bytes"], "mapped_bytes": r["mapped_bytes"]}}
+          for r in frs.registry.report()}}
+print(json.dumps({{"errors": {{k: v for k, v in errors.items() if v}}, "artifacts": report}}), flush=True)
+sys.stdin.read()  # stay alive until the parent has measured us
+"""
+
+
+def smaps_rollup(pid: int) -> Dict[str, float]:
+    """Rss/Pss/Shared/Private MB of a process from /proc/<pid>/smaps_rollup."""
+    values: Dict[str, float] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return {
+        "rss_mb": round(values.get("Rss", 0.0), 1),
+        "pss_mb": round(values.get("Pss", 0.0), 1),
+        "shared_mb": round(values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0), 1),
+        "private_mb": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def measure(workers: int, mmap: bool, claims: int, model_backend: str) -> Dict[str, Any]:
+    env = {**os.environ, "FRAUD_MODEL_MMAP": "1" if mmap else "0", "FRAUD_MODEL_BACKEND": model_backend}
+    code = _WORKER.format(root=ROOT, bench=os.path.dirname(os.path.abspath(__file__)), claims=claims)
+    procs = [subprocess.Popen([sys.executable, "-c", code], env=env, cwd=ROOT, stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+    try:
+        loaded = [json.loads(p.stdout.readline()) for p in procs]
+        time.sleep(0.5)
+        per_worker = [smaps_rollup(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return {
+        "mmap": mmap,
+        "workers": per_worker,
+        "pss_total_mb": round(sum(w["pss_mb"] for w in per_worker), 1),
+        "pss_per_worker_mb": round(float(np.mean([w["pss_mb"] for w in per_worker])), 1),
+        "rss_per_worker_mb": round(float(np.mean([w["rss_mb"] for w in per_worker])), 1),
+        "artifacts": loaded[0]["artifacts"],
+        "load_errors": loaded[0]["errors"],
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--claims", type=int, default=50, help="claims each worker scores before measuring")
+    parser.add_argument("--model-backend", choices=["compiled", "sklearn"], default="compiled")
+    parser.add_argument("--output", default="memory_results.json")
+    args = parser.parse_args(argv)
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        parser.error("needs Linux /proc/<pid>/smaps_rollup")
+
+    report: Dict[str, Any] = {
+        "model_backend": args.model_backend,
+        "text_backend": os.environ.get("FRAUD_TEXT_BACKEND", "minilm"),
+        "cpu_count": os.cpu_count(),
+        "mapped": measure(args.workers, True, args.claims, args.model_backend),
+        "private": measure(args.workers, False, args.claims, args.model_backend),
+    }
+    report["pss_saved_per_worker_mb"] = round(report["private"]["pss_per_worker_mb"]
+                                              - report["mapped"]["pss_per_worker_mb"], 1)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Benchmarks for the scoring hot paths.
+
+    python benchmarks/bench_scoring.py --output bench_results.json
+
+Measures single-claim latency (p50/p95/p99 of fraudriskscore_ensemble),
+batch throughput of score_batch at several sizes, peak RSS and the time
+spent in each stage (text cleaning, embedding, text model, feature
+engineering, frame building, each classifier). Results are written as JSON
+so runs can be compared across commits.
+
+The cascade section scores the same claims with and without the
+FRAUD_ENSEMBLE_CASCADE early exit (single claims and score_batch) and
+reports how many model evaluations were skipped. Any claim whose risk level
+or decision differs from full evaluation is listed under "mismatches" and
+makes the run exit with status 1.
+"""
+import argparse, datetime, json, os, platform, resource, subprocess, sys, time
+from typing import Any, Callable, Dict, List
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fraudriskscore_final as frs
+
+# --- Synthetic claims (REQUIRED_INPUT_COLUMNS) ---
+
+_STATES = ["OH", "IN", "IL"]
+_CSL = ["100/300", "250/500", "500/1000"]
+_EDUCATION = ["Associate", "College", "High School", "JD", "MD", "Masters", "PhD"]
+_OCCUPATIONS = ["craft-repair", "sales", "exec-managerial", "tech-support", "prof-specialty"]
+_HOBBIES = ["chess", "reading", "golf", "cross-fit", "board-games"]
+_RELATIONSHIPS = ["husband", "wife", "own-child", "unmarried", "not-in-family"]
+_INCIDENT_TYPES = ["Single Vehicle Collision", "Multi-vehicle Collision", "Parked Car", "Vehicle Theft"]
+_COLLISIONS = ["Rear Collision", "Side Collision", "Front Collision", "?"]
+_SEVERITIES = ["Major Damage", "Minor Damage", "Total Loss", "Trivial Damage"]
+_AUTHORITIES = ["Police", "Fire", "Ambulance", "Other", "None"]
+_CITIES = ["Columbus", "Arlington", "Springfield", "Riverwood", "Northbend"]
+_MAKES = [("Saab", "92x"), ("Dodge", "RAM"), ("Honda", "Civic"), ("Toyota", "Camry"), ("BMW", "X5")]
+_DESCRIPTIONS = [
+    "Rear-end collision while stopped at a red light. Airbag deployed. Claimant reported neck pain.",
+    "Vehicle parked overnight on the street was found with a smashed window and missing stereo.",
+    "Side collision at an intersection; the other driver left the scene before police arrived.",
+    "Single vehicle lost control on a wet road and hit a guard rail, front bumper destroyed.",
+    "Multi-vehicle pile-up on the highway in heavy fog, several passengers taken to hospital.",
+]
+
+
+def synthetic_claims(n: int, seed: int = 0, unique_text: bool = True) -> pd.DataFrame:
+    """n claims with every REQUIRED_INPUT_COLUMNS field; descriptions are made unique by default."""
+    rng = np.random.default_rng(seed)
+    bind = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 3650, n), unit="D")
+    incident = bind + pd.to_timedelta(rng.integers(1, 4000, n), unit="D")
+    injury, prop, vehicle = (rng.integers(0, 20000, n) for _ in range(3))
+    makes = rng.integers(0, len(_MAKES), n)
+    descriptions = np.array(_DESCRIPTIONS, dtype=object)[rng.integers(0, len(_DESCRIPTIONS), n)]
+    if unique_text:
+        descriptions = [f"{d} Reference {i}-{seed}." for i, d in enumerate(descriptions)]
+
+    def pick(values: List[str]) -> np.ndarray:
+        return np.array(values, dtype=object)[rng.integers(0, len(values), n)]
+
+    df = pd.DataFrame({
+        "months_as_customer": rng.integers(0, 480, n),
+        "age": rng.integers(19, 80, n),
+        "policy_number": rng.integers(100000, 999999, n),
+        "policy_bind_date": bind.strftime("%Y-%m-%d"),
+        "policy_state": pick(_STATES),
+        "policy_csl": pick(_CSL),
+        "policy_deductable": rng.choice([500, 1000, 2000], n),
+        "policy_annual_premium": np.round(rng.uniform(400, 2200, n), 2),
+        "umbrella_limit": rng.choice([0, 0, 0, 5000000, 6000000], n),
+        "insured_zip": rng.integers(430000, 620000, n),
+        "insured_sex": pick(["MALE", "FEMALE"]),
+        "insured_education_level": pick(_EDUCATION),
+        "insured_occupation": pick(_OCCUPATIONS),
+        "insured_hobbies": pick(_HOBBIES),
+        "insured_relationship": pick(_RELATIONSHIPS),
+        "capital-gains": rng.integers(0, 100000, n),
+        "capital-loss": -rng.integers(0, 100000, n),
+        "incident_date": incident.strftime("%Y-%m-%d"),
+        "incident_type": pick(_INCIDENT_TYPES),
+        "collision_type": pick(_COLLISIONS),
+        "incident_severity": pick(_SEVERITIES),
+        "authorities_contacted": pick(_AUTHORITIES),
+        "incident_state": pick(["NY", "SC", "WV", "VA"]),
+        "incident_city": pick(_CITIES),
+        "incident_location": [f"{k} Main St" for k in rng.integers(1, 9999, n)],
+        "incident_hour_of_the_day": rng.integers(0, 24, n),
+        "number_of_vehicles_involved": rng.integers(1, 5, n),
+        "property_damage": pick(["YES", "NO", "?"]),
+        "bodily_injuries": rng.integers(0, 3, n),
+        "witnesses": rng.integers(0, 4, n),
+        "police_report_available": pick(["YES", "NO", "?"]),
+        "total_claim_amount": injury + prop + vehicle,
+        "injury_claim": injury,
+        "property_claim": prop,
+        "vehicle_claim": vehicle,
+        "auto_make": [_MAKES[k][0] for k in makes],
+        "auto_model": [_MAKES[k][1] for k in makes],
+        "auto_year": rng.integers(1995, 2016, n),
+        "claim_description": descriptions,
+    })
+    return df[frs.REQUIRED_INPUT_COLUMNS]
+
+
+# --- Measurement helpers ---
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentiles_ms(samples: List[float]) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def _timed(fn: Callable[[], Any]) -> tuple:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+# --- Benchmarks ---
+
+def stage_split(claims: pd.DataFrame) -> Dict[str, float]:
+    """Seconds spent in each scoring stage for one batch (embedding cache bypassed)."""
+    stages: Dict[str, float] = {}
+    stages["text_cleaning"], cleaned = _timed(lambda: [frs.clean_text(t) for t in frs._extract_texts(claims)])
+    unique = [c for c in dict.fromkeys(cleaned) if c != ""]
+    if frs.TEXT_BACKEND == "hashed":
+        stages["text_model"], _ = _timed(lambda: frs._hashed_text_scores(unique))
+    else:
+        stages["embedding"], emb = _timed(lambda: frs._encode_batched(unique))
+        stages["text_model"], _ = _timed(lambda: frs._text_model_scores(emb))
+    stages["feature_engineering"], engineered = _timed(lambda: frs.engineer_features(claims))
+    stages["frame_building"], frame = _timed(lambda: frs._build_input_frame(engineered))
+    for name in frs.ENSEMBLE_ORDER:
+        model = frs.registry.get(frs.ENSEMBLE_ARTIFACTS[name])
+        stages[f"classifier_{name}"], _ = _timed(lambda: frs._predict_proba(model, frame))
+    return {k: round(v, 4) for k, v in stages.items()}
+
+
+def single_claim_latency(claims: pd.DataFrame) -> Dict[str, Any]:
+    """fraudriskscore_ensemble latency per claim, plus the mean per-stage split."""
+    engineered = frs.engineer_features(claims)
+    records = [row for row in engineered.to_dict(orient="records")]
+    frs.fraudriskscore_ensemble(records[0])  # warm-up (first-call overheads)
+    frs.embedding_cache.clear()
+
+    latencies = []
+    stages: Dict[str, List[float]] = {}
+    for claim in records:
+        latencies.append(_timed(lambda: frs.fraudriskscore_ensemble(claim))[0])
+
+        # Same work, stage by stage (fresh embedding, no cache)
+        t, cleaned = _timed(lambda: frs.clean_text(frs._extract_text(claim)))
+        stages.setdefault("text_cleaning", []).append(t)
+        if frs.TEXT_BACKEND == "hashed":
+            t, _ = _timed(lambda: frs._hashed_text_scores([cleaned]))
+        else:
+            t, emb = _timed(lambda: frs._encode_batched([cleaned]))
+            stages.setdefault("embedding", []).append(t)
+            t, _ = _timed(lambda: frs._text_model_scores(emb))
+        stages.setdefault("text_model", []).append(t)
+        t, frame = _timed(lambda: frs._build_input_df(claim))
+        stages.setdefault("frame_building", []).append(t)
+        for name in frs.ENSEMBLE_ORDER:
+            model = frs.registry.get(frs.ENSEMBLE_ARTIFACTS[name])
+            t, _ = _timed(lambda: frs._predict_proba(model, frame))
+            stages.setdefault(f"classifier_{name}", []).append(t)
+        frs.embedding_cache.clear()
+
+    out = {"claims": len(records), **_percentiles_ms(latencies)}
+    out["stages_mean_ms"] = {k: round(float(np.mean(v)) * 1000.0, 3) for k, v in stages.items()}
+    return out
+
+
+def batch_throughput(sizes: List[int], seed: int, workers: int) -> List[Dict[str, Any]]:
+    """score_batch wall time and claims/sec for each size (cold embedding cache)."""
+    results = []
+    for size in sizes:
+        claims = synthetic_claims(size, seed=seed + size)
+        frs.embedding_cache.clear()
+        seconds, _ = _timed(lambda: frs.score_batch(claims, workers=workers))
+        results.append({
+            "claims": size,
+            "workers": workers,
+            "seconds": round(seconds, 4),
+            "claims_per_sec": round(size / seconds, 1) if seconds > 0 else None,
+            "stages_s": stage_split(claims),
+        })
+    return results
+
+
+def _with_cascade(enabled: bool, fn: Callable[[], Any]) -> Any:
+    previous = frs.ENSEMBLE_CASCADE
+    frs.ENSEMBLE_CASCADE = enabled
+    try:
+        return fn()
+    finally:
+        frs.ENSEMBLE_CASCADE = previous
+
+
+def _ensemble_outcome(claim: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return frs._ensemble(claim)
+    except Exception:
+        return {"risk_level": "ERROR", "decision": None}
+
+
+def cascade_agreement(claims: pd.DataFrame) -> Dict[str, Any]:
+    """Cascade vs full evaluation: decisions must match; skipped evaluations and latency (result cache bypassed)."""
+    engineered = frs.engineer_features(claims)
+    records = engineered.to_dict(orient="records")
+    mismatches: List[Dict[str, Any]] = []
+    skipped = {name: 0 for name in frs.ENSEMBLE_ORDER}
+    latencies: Dict[str, List[float]] = {"full": [], "cascade": []}
+
+    for i, claim in enumerate(records):
+        full_s, full = _timed(lambda: _with_cascade(False, lambda: _ensemble_outcome(claim)))
+        cascade_s, cascade = _timed(lambda: _with_cascade(True, lambda: _ensemble_outcome(claim)))
+        latencies["full"].append(full_s)
+        latencies["cascade"].append(cascade_s)
+        for name in cascade.get("skipped_models", []):
+            skipped[name] += 1
+        if (full["risk_level"], full["decision"]) != (cascade["risk_level"], cascade["decision"]):
+            mismatches.append({"path": "single", "row": i, "full": full["risk_level"], "cascade": cascade["risk_level"]})
+
+    full = _with_cascade(False, lambda: frs.score_batch(engineered, engineer=False, use_cache=False))
+    cascade = _with_cascade(True, lambda: frs.score_batch(engineered, engineer=False, use_cache=False))
+    differs = ((full["risk_level"].astype(object) != cascade["risk_level"].astype(object))
+               | (full["decision"].astype(object).fillna("") != cascade["decision"].astype(object).fillna("")))
+    for i in np.flatnonzero(differs.to_numpy()):
+        mismatches.append({"path": "batch", "row": int(i), "full": full["risk_level"].iloc[i],
+                           "cascade": cascade["risk_level"].iloc[i]})
+
+    return {
+        "claims": len(records),
+        "order": list(frs.CASCADE_ORDER),
+        "skipped_single": skipped,
+        "skipped_batch": {name: int(cascade[f"score_{name}"].isna().sum() - full[f"score_{name}"].isna().sum())
+                          for name in frs.ENSEMBLE_ORDER},
+        "single_full": _percentiles_ms(latencies["full"]),
+        "single_cascade": _percentiles_ms(latencies["cascade"]),
+        "mismatches": mismatches,
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--single", type=int, default=200, help="claims for the single-claim latency run")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated batch sizes")
+    parser.add_argument("--workers", type=int, default=1, help="score_batch worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    load_seconds, _ = _timed(frs.registry.warm)
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model_load_s": round(load_seconds, 3),
+        "single_claim": single_claim_latency(synthetic_claims(args.single, seed=args.seed)),
+        "batch": batch_throughput([int(s) for s in args.sizes.split(",") if s], args.seed, args.workers),
+        "cascade": cascade_agreement(synthetic_claims(args.single, seed=args.seed + 1)),
+    }
+    report["peak_rss_mb"] = _peak_rss_mb()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main()["cascade"]["mismatches"] else 0)
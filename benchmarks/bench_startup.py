@@ -0,0 +1,111 @@
+"""Cold-start benchmark: import time of the entry modules and what they pull in.
+
+    python benchmarks/bench_startup.py --output startup_results.json
+    python benchmarks/bench_startup.py --check benchmarks/startup_baseline.json
+
+Each module is imported in a fresh interpreter under `python -X importtime`
+(median of --repeat runs). The report lists the total import time, the
+slowest direct imports, and any heavyweight module (TensorFlow, torch,
+transformers, ...) that became loaded just by importing; the embedding
+stack must only load when the embedder is first used. --check compares
+against a saved report and exits 1 when an import got slower than
+--tolerance times the baseline or a heavyweight module appears.
+"""
+import argparse, json, os, platform, subprocess, sys
+from typing import Any, Dict, List
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["fraudriskscore_final", "scoring_api"]
+# Must not be imported by the entry modules (only lazily, by the embedder loader).
+HEAVY_MODULES = ["tensorflow", "torch", "transformers", "sentence_transformers", "matplotlib"]
+
+_PROBE = "import json, sys; import {module}; print(json.dumps(sorted(m for m in {heavy} if m in sys.modules)))"
+
+
+def _parse_importtime(stderr: str, module: str) -> tuple:
+    """(cumulative ms of module, {direct import of module: cumulative ms}) from -X importtime output.
+
+    -X importtime prints children before their parent, indented by two more spaces.
+    """
+    pending: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        name, ms = name.strip(), int(cumulative) / 1000.0
+        if depth == 1:
+            pending[name] = pending.get(name, 0.0) + ms
+        elif depth == 0:
+            if name == module:
+                return ms, pending
+            pending = {}
+    return 0.0, pending
+
+
+def measure(module: str, repeat: int) -> Dict[str, Any]:
+    totals: List[float] = []
+    children: Dict[str, List[float]] = {}
+    heavy: List[str] = []
+    for _ in range(repeat):
+        code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        total, direct = _parse_importtime(proc.stderr, module)
+        totals.append(total)
+        for name, ms in direct.items():
+            children.setdefault(name, []).append(ms)
+        heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+    slowest = sorted(((n, float(np.median(v))) for n, v in children.items()), key=lambda kv: -kv[1])[:10]
+    return {
+        "import_ms": round(float(np.median(totals)), 1),
+        "runs": repeat,
+        "slowest_direct_imports_ms": {n: round(ms, 1) for n, ms in slowest},
+        "heavy_modules_loaded": heavy,
+    }
+
+
+def check(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems = []
+    for module, result in report["modules"].items():
+        if result["heavy_modules_loaded"]:
+            problems.append(f"{module} imports {', '.join(result['heavy_modules_loaded'])}")
+        base = baseline.get("modules", {}).get(module)
+        if base and result["import_ms"] > base["import_ms"] * tolerance:
+            problems.append(f"{module} import took {result['import_ms']} ms "
+                            f"(baseline {base['import_ms']} ms, tolerance x{tolerance})")
+    return problems
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--check", help="baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor vs the baseline")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "modules": {m: measure(m, args.repeat) for m in args.modules.split(",") if m},
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.check:
+        with open(args.check) as f:
+            problems = check(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
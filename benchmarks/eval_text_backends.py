@@ -0,0 +1,132 @@
+"""Compares the Text Suspicion Score backends (FRAUD_TEXT_BACKEND).
+
+    python benchmarks/eval_text_backends.py --csv claims.csv --backends minilm,minilm-int8,hashed
+
+Each backend runs in its own subprocess so load time and memory are measured
+from a clean interpreter. Reported per backend: model load time, peak RSS,
+per-text latency (p50/p95/p99, no embedding cache), batch throughput, and
+agreement with the reference backend (the first one listed): score MAE,
+max difference, correlation, and how often the ensemble risk level and
+rounded fraud_risk_score stay the same.
+"""
+import argparse, json, os, subprocess, sys, tempfile
+from typing import Any, Dict, List
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _claims(args: argparse.Namespace) -> pd.DataFrame:
+    if args.csv:
+        return pd.read_csv(args.csv, nrows=args.claims)
+    from bench_scoring import synthetic_claims
+    return synthetic_claims(args.claims, seed=args.seed)
+
+
+# --- One backend (child process, FRAUD_TEXT_BACKEND already set) ---
+
+def run_backend(args: argparse.Namespace) -> Dict[str, Any]:
+    from bench_scoring import _peak_rss_mb, _percentiles_ms, _timed
+    import fraudriskscore_final as frs
+
+    claims = _claims(args)
+    cleaned = [frs.clean_text(t) for t in frs._extract_texts(claims)]
+    unique = [c for c in dict.fromkeys(cleaned) if c != ""]
+    rss_before = _peak_rss_mb()
+    load_seconds, _ = _timed(frs.registry.warm)
+    frs._score_texts(unique[:1])  # warm-up (first-call overheads)
+
+    latencies = []
+    for text in unique[:args.single]:
+        latencies.append(_timed(lambda: frs._score_texts([text]))[0])
+        frs.embedding_cache.clear()
+    batch_seconds, scores = _timed(lambda: frs._score_texts(unique))
+    frs.embedding_cache.clear()
+    results = frs.score_batch(claims, use_cache=False)
+
+    return {
+        "backend": frs.TEXT_BACKEND,
+        "load_s": round(load_seconds, 3),
+        "rss_before_load_mb": rss_before,
+        "peak_rss_mb": _peak_rss_mb(),
+        "single_text": {"texts": len(latencies), **_percentiles_ms(latencies)},
+        "batch": {"texts": len(unique), "seconds": round(batch_seconds, 4),
+                  "texts_per_sec": round(len(unique) / batch_seconds, 1) if batch_seconds > 0 else None},
+        "texts": unique,
+        "scores": [float(s) for s in scores],
+        "risk_level": results["risk_level"].tolist(),
+        "fraud_risk_score": results["fraud_risk_score"].tolist(),
+    }
+
+
+# --- Comparison (parent process) ---
+
+def _spawn(backend: str, argv: List[str]) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out = f.name
+    try:
+        env = {**os.environ, "FRAUD_TEXT_BACKEND": backend}
+        subprocess.run([sys.executable, os.path.abspath(__file__), *argv, "--run", out], env=env, check=True)
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        os.unlink(out)
+
+
+def compare(reference: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    from text_distill import agreement
+    ref = dict(zip(reference["texts"], reference["scores"]))
+    cand = dict(zip(candidate["texts"], candidate["scores"]))
+    texts = [t for t in cand if t in ref]
+    ref_tier, cand_tier = np.array(reference["risk_level"]), np.array(candidate["risk_level"])
+    ref_score = np.array(reference["fraud_risk_score"], dtype=float)
+    cand_score = np.array(candidate["fraud_risk_score"], dtype=float)
+    same_score = (ref_score == cand_score) | (np.isnan(ref_score) & np.isnan(cand_score))
+    return {
+        "text_score": agreement([ref[t] for t in texts], [cand[t] for t in texts]),
+        "ensemble": {
+            "claims": int(len(ref_tier)),
+            "risk_level_equal": round(float((ref_tier == cand_tier).mean()), 4) if len(ref_tier) else None,
+            "fraud_risk_score_equal": round(float(same_score.mean()), 4) if len(same_score) else None,
+        },
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="minilm,minilm-int8,hashed", help="first one is the reference")
+    parser.add_argument("--csv", help="claims CSV (default: synthetic claims)")
+    parser.add_argument("--claims", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=100, help="texts timed one at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="text_backends.json")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # child mode: write this backend's raw results here
+    args = parser.parse_args(argv)
+
+    if args.run:
+        with open(args.run, "w") as f:
+            json.dump(run_backend(args), f)
+        return {}
+
+    child_argv = ["--claims", str(args.claims), "--single", str(args.single), "--seed", str(args.seed)]
+    if args.csv:
+        child_argv += ["--csv", args.csv]
+    backends = [b for b in args.backends.split(",") if b]
+    runs = [_spawn(b, child_argv) for b in backends]
+
+    report: Dict[str, Any] = {"reference": backends[0], "backends": []}
+    for run in runs:
+        entry = {k: v for k, v in run.items() if k not in ("texts", "scores", "risk_level", "fraud_risk_score")}
+        entry["agreement"] = compare(runs[0], run)
+        report["backends"].append(entry)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Tuple
+from instrumentation import stage
+
+# Features derived from the raw claim fields (computed here for every entry point).
+ENGINEERED_FEATURES = [
+    'daysdiff', 'claim_to_premium_ratio', 'injury_ratio', 'property_ratio', 'vehicle_ratio',
+    'police_report_flag', 'property_damage_flag', 'authorities_contacted_flag',
+    'injury_flag', 'multiple_vehicles_flag'
+]
+
+
+def _column(df: pd.DataFrame, name: str, default: Any) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _is_plain_numeric(values: pd.Series) -> bool:
+    # numpy int/float columns take the NumPy path; object and extension dtypes keep pandas semantics
+    return isinstance(values.dtype, np.dtype) and values.dtype.kind in "iuf"
+
+def _null_results(values: pd.Series, nulls: np.ndarray, fn) -> np.ndarray:
+    """fn(value) for the null entries, once per null type (None, NaN, NaT and pd.NA differ)."""
+    seen = {}
+    out = []
+    for v in values.to_numpy(dtype=object)[nulls]:
+        kind = type(v)
+        if kind not in seen:
+            seen[kind] = fn(v)
+        out.append(seen[kind])
+    return np.array(out, dtype=bool)
+
+def _date_failed(value: Any) -> bool:
+    try:
+        return pd.to_datetime(value) is None
+    except Exception:
+        return True
+
+def _parse_date_column(values: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """Parses a date column the way a per-value pd.to_datetime would.
+
+    Each distinct value is parsed once. Returns the parsed dates (NaT where
+    unparseable) and a mask of values that would have raised (or parsed to
+    None), which the row-wise code mapped to daysdiff = 0.
+    """
+    codes, uniques = pd.factorize(values)
+    # Trailing None: null entries (code -1) take the last slot and parse to NaT.
+    parsed = pd.to_datetime(pd.Series(list(uniques) + [None], dtype=object), errors="coerce", format="mixed")
+    failed = np.zeros(len(parsed), dtype=bool)
+    for i in np.flatnonzero(parsed.isna().to_numpy()[:-1]):
+        failed[i] = _date_failed(uniques[i])
+
+    failed = failed[codes]
+    nulls = codes == -1
+    if nulls.any():
+        failed[nulls] = _null_results(values, nulls, _date_failed)
+    return parsed.take(codes).reset_index(drop=True), failed
+
+def _ratio_inputs(df: pd.DataFrame, name: str) -> Any:
+    values = _column(df, name, 0)
+    return values.to_numpy() if _is_plain_numeric(values) else values
+
+def _safe_denominator(values: Any) -> Any:
+    if isinstance(values, np.ndarray):
+        return np.where(values > 0, values, 1.0)
+    return values.where(values > 0, 1.0)
+
+def _positive_flag(df: pd.DataFrame, name: str, above: int) -> np.ndarray:
+    values = _column(df, name, 0)
+    if _is_plain_numeric(values):
+        return (values.to_numpy() > above).astype(int)
+    return (values > above).astype(int).to_numpy()
+
+def _upper_in(df: pd.DataFrame, name: str, targets: Tuple[str, ...]) -> np.ndarray:
+    """str(value).upper() in targets, evaluated once per distinct value."""
+    values = _column(df, name, None)
+    codes, uniques = pd.factorize(values)
+    hits = pd.Series(uniques, dtype=object).astype(str).str.upper().isin(targets).to_numpy()
+    out = np.append(hits, False)[codes]
+    nulls = codes == -1
+    if nulls.any():
+        out[nulls] = _null_results(values, nulls, lambda v: str(v).upper() in targets)
+    return out
+
+def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds daysdiff, the claim ratios and the *_flag columns to a claims frame (column-wise)."""
+    with stage("feature_engineering"):
+        return _engineer(df)
+
+def _engineer(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+
+    # Date Handling (each distinct date string is parsed once)
+    bind, bind_failed = _parse_date_column(_column(df, 'policy_bind_date', None))
+    incident, incident_failed = _parse_date_column(_column(df, 'incident_date', None))
+    daysdiff = (incident - bind).dt.days.to_numpy()
+    daysdiff = np.where(bind_failed | incident_failed, 0, daysdiff)
+    df['daysdiff'] = daysdiff.astype("int64") if not np.isnan(daysdiff).any() else daysdiff
+
+    # Ratio Handling
+    total_claim = _ratio_inputs(df, 'total_claim_amount')
+    annual_premium = _ratio_inputs(df, 'policy_annual_premium')
+
+    safe_total = _safe_denominator(total_claim)
+    safe_premium = _safe_denominator(annual_premium)
+
+    df['claim_to_premium_ratio'] = total_claim / safe_premium
+    df['injury_ratio'] = _ratio_inputs(df, 'injury_claim') / safe_total
+    df['property_ratio'] = _ratio_inputs(df, 'property_claim') / safe_total
+    df['vehicle_ratio'] = _ratio_inputs(df, 'vehicle_claim') / safe_total
+
+    # Flag Handling
+    df['police_report_flag'] = _upper_in(df, 'police_report_available', ("YES",)).astype(int)
+    df['property_damage_flag'] = _upper_in(df, 'property_damage', ("YES",)).astype(int)
+    df['authorities_contacted_flag'] = (~_upper_in(df, 'authorities_contacted', ("NONE", "NAN"))).astype(int)
+    df['injury_flag'] = _positive_flag(df, 'bodily_injuries', 0)
+    df['multiple_vehicles_flag'] = _positive_flag(df, 'number_of_vehicles_involved', 1)
+
+    return df
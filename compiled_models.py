@@ -0,0 +1,383 @@
+"""NumPy-only inference for the tabular ensemble (final_model, model_lr, model_gbc).
+
+    python compiled_models.py export --stage ./next-release [--claims 2000] [--csv claims.csv] [--tol 1e-9]
+    python model_releases.py publish ./next-release --version 2026-10-18
+    python compiled_models.py check                 # the live release's compiled files against sklearn
+
+export flattens every fitted Pipeline (ColumnTransformer of StandardScaler +
+OneHotEncoder, then a RandomForest, GradientBoosting or LogisticRegression
+classifier) into arrays saved next to its .joblib as <name>.compiled.npz in
+--stage, a copy of the live release (never the live release itself), then
+checks the compiled probabilities against sklearn's predict_proba on sample
+claims. With FRAUD_MODEL_BACKEND=compiled, fraudriskscore_final loads
+these files instead of the pickles.
+
+The .npz files are written uncompressed, so load() can memory-map the
+arrays (mmap_mode="r"): worker processes on one host then share a single
+page-cache copy of the tree structures instead of each holding its own.
+
+The evaluators repeat sklearn's arithmetic in the same order, so results
+normally match bit for bit. Tree inputs are compared as float32, forests
+average the trees in order, boosting adds learning_rate * leaf value stage by
+stage, and the linear model sums the sparse row left to right.
+"""
+import argparse, json, os, struct, sys, zipfile
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+COMPILED_SUFFIX = ".compiled.npz"
+
+
+def compiled_path(joblib_path: str) -> str:
+    return os.path.splitext(joblib_path)[0] + COMPILED_SUFFIX
+
+
+# --- Export (sklearn -> arrays) ---
+
+def _tag(value: Any) -> List[Any]:
+    # JSON-safe category with its type, so 1, 1.0 and "1" stay distinct
+    if isinstance(value, str):
+        return ["str", value]
+    if isinstance(value, (bool, np.bool_)):
+        return ["bool", bool(value)]
+    if isinstance(value, (int, np.integer)):
+        return ["int", int(value)]
+    if isinstance(value, (float, np.floating)):
+        return ["float", None if value != value else float(value)]
+    raise ValueError(f"unsupported category type {type(value).__name__}")
+
+def _untag(tagged: List[Any]) -> Any:
+    kind, value = tagged
+    if kind == "float":
+        return float("nan") if value is None else float(value)
+    return {"str": str, "bool": bool, "int": int}[kind](value)
+
+def _flatten_trees(trees: List[Any], leaf_fn) -> Dict[str, np.ndarray]:
+    """Concatenates sklearn Tree objects; leaves point to themselves (left == node marks a leaf)."""
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        idx = np.arange(t.node_count)
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(np.where(is_leaf, 0.0, t.threshold))
+        left.append(np.where(is_leaf, idx, t.children_left) + offset)
+        right.append(np.where(is_leaf, idx, t.children_right) + offset)
+        value.append(leaf_fn(t.value))
+        offset += t.node_count
+    return {
+        "tree_feature": np.concatenate(feature).astype(np.int64),
+        "tree_threshold": np.concatenate(threshold).astype(np.float64),
+        "tree_left": np.concatenate(left).astype(np.int64),
+        "tree_right": np.concatenate(right).astype(np.int64),
+        "tree_value": np.concatenate(value).astype(np.float64),
+        "tree_roots": np.asarray(roots, dtype=np.int64),
+    }
+
+def _class1_proba(value: np.ndarray) -> np.ndarray:
+    # DecisionTreeClassifier.predict_proba: node counts normalized per node
+    proba = value[:, 0, :].astype(np.float64)
+    normalizer = proba.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    proba /= normalizer
+    return proba[:, 1]
+
+def compile_pipeline(pipeline: Any) -> Dict[str, np.ndarray]:
+    """Arrays (plus a JSON "meta" entry) describing a fitted preprocessing + classifier Pipeline."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.dummy import DummyClassifier
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    steps = getattr(pipeline, "steps", None)
+    if not steps or len(steps) != 2 or not isinstance(steps[0][1], ColumnTransformer):
+        raise ValueError("expected Pipeline([ColumnTransformer, classifier])")
+    ct, clf = steps[0][1], steps[1][1]
+    if list(getattr(clf, "classes_", [])) != [0, 1]:
+        raise ValueError("only binary classifiers with classes [0, 1] are supported")
+
+    num_cols, cat_cols, scaler, encoder = None, None, None, None
+    for name, transformer, columns in ct.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        if isinstance(transformer, StandardScaler) and num_cols is None and cat_cols is None:
+            num_cols, scaler = list(columns), transformer
+        elif isinstance(transformer, OneHotEncoder) and cat_cols is None:
+            cat_cols, encoder = list(columns), transformer
+        else:
+            raise ValueError(f"unsupported transformer {name!r}: {transformer!r}")
+    if encoder is not None and (encoder.drop_idx_ is not None or encoder.handle_unknown != "ignore"
+                                or getattr(encoder, "_infrequent_enabled", False)):
+        raise ValueError("OneHotEncoder must use handle_unknown='ignore', no drop and no infrequent categories")
+    num_cols, cat_cols = num_cols or [], cat_cols or []
+    n_num = len(num_cols)
+    categories = [list(c) for c in encoder.categories_] if encoder is not None else []
+    offsets = np.cumsum([n_num] + [len(c) for c in categories])[:-1].astype(np.int64)
+    n_features = n_num + sum(len(c) for c in categories)
+
+    # Subtracting 0.0 / dividing by 1.0 leaves values unchanged, like the scaler's with_mean/with_std=False.
+    arrays: Dict[str, np.ndarray] = {
+        "num_mean": np.asarray(scaler.mean_, dtype=np.float64) if scaler is not None and scaler.with_mean else np.zeros(n_num),
+        "num_scale": np.asarray(scaler.scale_, dtype=np.float64) if scaler is not None and scaler.with_std else np.ones(n_num),
+        "cat_offsets": offsets,
+    }
+    meta: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "feature_names_in": [str(c) for c in pipeline.feature_names_in_],
+        "num_cols": num_cols, "cat_cols": cat_cols,
+        "categories": [[_tag(v) for v in c] for c in categories],
+        "n_features": int(n_features),
+        "sparse_output": bool(ct.sparse_output_),
+    }
+
+    if isinstance(clf, LogisticRegression):
+        if clf.coef_.shape[0] != 1:
+            raise ValueError("only binary LogisticRegression is supported")
+        meta["kind"] = "linear"
+        arrays["coef"] = np.asarray(clf.coef_[0], dtype=np.float64)
+        arrays["intercept"] = np.asarray(clf.intercept_, dtype=np.float64)
+    elif isinstance(clf, RandomForestClassifier):
+        if clf.n_outputs_ != 1:
+            raise ValueError("only single-output forests are supported")
+        meta["kind"] = "forest"
+        arrays.update(_flatten_trees(clf.estimators_, _class1_proba))
+    elif isinstance(clf, GradientBoostingClassifier):
+        if clf.estimators_.shape[1] != 1:
+            raise ValueError("only binary GradientBoostingClassifier is supported")
+        if not (isinstance(clf.init_, DummyClassifier) or clf.init_ == "zero"):
+            raise ValueError("only the default (prior) or 'zero' init is supported")
+        meta["kind"] = "boosting"
+        meta["learning_rate"] = float(clf.learning_rate)
+        # The prior does not depend on X: evaluate it once on a dummy row.
+        dummy = np.zeros((1, clf.n_features_in_), dtype=np.float32)
+        arrays["init_raw"] = np.asarray(clf._raw_predict_init(dummy)[0, 0], dtype=np.float64)
+        arrays.update(_flatten_trees(list(clf.estimators_[:, 0]), lambda v: v[:, 0, 0]))
+    else:
+        raise ValueError(f"unsupported classifier {type(clf).__name__}")
+
+    arrays["meta"] = np.array(json.dumps(meta))
+    return arrays
+
+def save(pipeline: Any, path: str) -> str:
+    arrays = compile_pipeline(pipeline)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+# --- Runtime ---
+
+class CompiledPipeline:
+    """predict_proba-compatible evaluator loaded from a .compiled.npz file."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        meta = json.loads(str(arrays["meta"]))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported compiled model format {meta.get('format_version')!r}")
+        self.kind: str = meta["kind"]
+        self.feature_names_in_ = np.asarray(meta["feature_names_in"], dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.classes_ = np.array([0, 1])
+        self.num_cols: List[str] = meta["num_cols"]
+        self.cat_cols: List[str] = meta["cat_cols"]
+        self.n_features: int = meta["n_features"]
+        self.sparse_output: bool = meta["sparse_output"]
+        self.learning_rate: Optional[float] = meta.get("learning_rate")
+        self.categories = [pd.Index([_untag(v) for v in c], dtype=object) for c in meta["categories"]]
+        self.arrays = {k: v for k, v in arrays.items() if k != "meta"}
+        self.num_mean = self.arrays["num_mean"]
+        self.num_scale = self.arrays["num_scale"]
+        self.cat_offsets = self.arrays["cat_offsets"]
+
+    # --- preprocessing (StandardScaler + OneHotEncoder) ---
+
+    def _transform(self, X: pd.DataFrame) -> tuple:
+        """Scaled numeric block (n, n_num) and one-hot codes (n, n_cat; -1 = unknown category)."""
+        num = X[self.num_cols].to_numpy(dtype=np.float64, copy=True) if self.num_cols else np.empty((len(X), 0))
+        num -= self.num_mean
+        num /= self.num_scale
+        codes = np.empty((len(X), len(self.cat_cols)), dtype=np.int64)
+        for j, (col, cats) in enumerate(zip(self.cat_cols, self.categories)):
+            codes[:, j] = cats.get_indexer(X[col].to_numpy(dtype=object))
+        return num, codes
+
+    def _dense(self, num: np.ndarray, codes: np.ndarray, dtype: Any) -> np.ndarray:
+        out = np.zeros((num.shape[0], self.n_features), dtype=dtype)
+        out[:, :num.shape[1]] = num
+        rows, cols = np.nonzero(codes >= 0)
+        out[rows, self.cat_offsets[cols] + codes[rows, cols]] = 1
+        return out
+
+    @staticmethod
+    def _check_finite(X: np.ndarray) -> None:
+        if not np.isfinite(X).all():
+            what = "NaN" if np.isnan(X).any() else f"infinity or a value too large for dtype({X.dtype.name!r})"
+            raise ValueError(f"Input X contains {what}.")
+
+    # --- classifiers ---
+
+    def _linear(self, num: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        from scipy.special import expit  # deferred: scipy.special is slow to import
+        self._check_finite(num)
+        coef = self.arrays["coef"]
+        n_num = num.shape[1]
+        if not self.sparse_output:
+            # The ColumnTransformer was fitted to a dense output: same dense dot as sklearn
+            decision = self._dense(num, codes, np.float64) @ coef
+        else:
+            # CSR row dot: sequential sum over the non-zero columns, left to right
+            decision = np.zeros(num.shape[0])
+            for j in range(n_num):
+                decision += num[:, j] * coef[j]
+            for j in range(codes.shape[1]):
+                known = codes[:, j] >= 0
+                decision[known] += coef[self.cat_offsets[j] + codes[known, j]]
+        return expit(decision + self.arrays["intercept"][0])
+
+    def _leaf_values(self, num: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """(n, n_trees) leaf values, all trees traversed together on float32 inputs."""
+        X = self._dense(num, codes, np.float32)
+        self._check_finite(X)
+        feature, threshold = self.arrays["tree_feature"], self.arrays["tree_threshold"]
+        left, right = self.arrays["tree_left"], self.arrays["tree_right"]
+        n_trees = len(self.arrays["tree_roots"])
+        node = np.repeat(self.arrays["tree_roots"][np.newaxis, :], X.shape[0], axis=0).ravel()
+        # Flat (row, tree) slots still inside a tree; slots drop out once they reach a leaf.
+        active = np.flatnonzero(left[node] != node)
+        flat_x, n_cols = X.ravel(), X.shape[1]
+        while active.size:
+            current = node[active]
+            go_left = flat_x[(active // n_trees) * n_cols + feature[current]] <= threshold[current]
+            current = np.where(go_left, left[current], right[current])
+            node[active] = current
+            active = active[left[current] != current]
+        return self.arrays["tree_value"][node].reshape(X.shape[0], n_trees)
+
+    def _forest(self, num: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        values = self._leaf_values(num, codes)
+        # cumsum adds tree by tree, in the order RandomForestClassifier accumulates them
+        return np.cumsum(values, axis=1)[:, -1] / values.shape[1]
+
+    def _boosting(self, num: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        from scipy.special import expit
+        values = self._leaf_values(num, codes)
+        stages = np.empty((values.shape[0], values.shape[1] + 1))
+        stages[:, 0] = self.arrays["init_raw"]
+        stages[:, 1:] = self.learning_rate * values
+        return expit(np.cumsum(stages, axis=1)[:, -1])
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        num, codes = self._transform(X)
+        p1 = {"linear": self._linear, "forest": self._forest, "boosting": self._boosting}[self.kind](num, codes)
+        return np.column_stack([1.0 - p1, p1])
+
+def _mapped_member(path: str, handle: Any, info: zipfile.ZipInfo) -> Optional[np.ndarray]:
+    """Read-only memory map of one stored (uncompressed) .npy member of an .npz, or None if it can't be mapped."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    # Local file header: 30 bytes, then the file name and extra field, then the .npy data.
+    handle.seek(info.header_offset)
+    header = handle.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    handle.seek(info.header_offset + 30 + name_len + extra_len)
+    version = np.lib.format.read_magic(handle)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran_order, dtype = read_header(handle)
+    if dtype.hasobject or not shape or 0 in shape:
+        return None
+    order = "F" if fortran_order else "C"
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape, order=order, offset=handle.tell()).view(np.ndarray)
+
+def load(path: str, mmap_mode: Optional[str] = None) -> CompiledPipeline:
+    """Loads a .compiled.npz; with mmap_mode="r" the arrays are memory-mapped instead of read into memory."""
+    if mmap_mode is None:
+        with np.load(path, allow_pickle=False) as data:
+            return CompiledPipeline({k: data[k] for k in data.files})
+    if mmap_mode != "r":
+        raise ValueError(f"compiled models can only be mapped read-only (mmap_mode='r'), got {mmap_mode!r}")
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as handle:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            mapped = _mapped_member(path, handle, info)
+            if mapped is None:
+                with archive.open(info) as member:
+                    mapped = np.lib.format.read_array(member, allow_pickle=False)
+            arrays[name] = mapped
+    return CompiledPipeline(arrays)
+
+
+# --- Tolerance check ---
+
+def check(pipeline: Any, compiled: CompiledPipeline, frame: pd.DataFrame, tol: float = 1e-9) -> Dict[str, Any]:
+    """Compares compiled and sklearn positive-class probabilities on an aligned input frame."""
+    expected = pipeline.predict_proba(frame)[:, 1]
+    actual = compiled.predict_proba(frame)[:, 1]
+    diff = np.abs(expected - actual)
+    return {
+        "rows": int(len(frame)),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "exact_rows": int((diff == 0).sum()),
+        "rounded_mismatches": int(sum(round(float(a), 4) != round(float(b), 4) for a, b in zip(expected, actual))),
+        "ok": bool((diff <= tol).all()),
+    }
+
+
+# --- CLI ---
+
+def _sample_frame(args: argparse.Namespace) -> pd.DataFrame:
+    import fraudriskscore_final as frs
+    if args.csv:
+        claims = pd.read_csv(args.csv, nrows=args.claims)
+    else:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+        from bench_scoring import synthetic_claims
+        claims = synthetic_claims(args.claims, seed=args.seed)
+    frame = frs._build_input_frame(frs.engineer_features(claims))
+    if "text_suspicion_score" in frame.columns:
+        frame["text_suspicion_score"] = np.random.default_rng(args.seed).random(len(frame))
+    return frame
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--claims", type=int, default=2000, help="sample claims for the tolerance check")
+    parser.add_argument("--csv", help="claims CSV for the check (default: synthetic claims)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tol", type=float, default=1e-9, help="max |compiled - sklearn| probability")
+    parser.add_argument("--stage", help="export: directory of the new release, a copy of the live release "
+                                        "(created when missing) that the compiled files are written to")
+    args = parser.parse_args(argv)
+    if args.command == "export" and not args.stage:
+        parser.error("export needs --stage: compiled files are published as a new release, not written into the live one")
+
+    import joblib
+    import fraudriskscore_final as frs
+    if args.command == "export":
+        paths = frs.stage_release(args.stage)
+    else:
+        paths = {name: frs.registry.path(filename) for name, filename in frs.releases.current().files.items()}
+    frame = _sample_frame(args)
+    ok = True
+    for member, name in frs.ENSEMBLE_ARTIFACTS.items():
+        joblib_path = paths[name]
+        pipeline = joblib.load(joblib_path)
+        out = compiled_path(joblib_path)
+        if args.command == "export":
+            save(pipeline, out)
+        report = check(pipeline, load(out), frame, args.tol)
+        ok &= report["ok"]
+        print(json.dumps({"model": member, "compiled": out, **report}))
+    if args.command == "export":
+        print(json.dumps({"publish": f"python model_releases.py publish {args.stage} --version <version>"}))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import hashlib, os, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# --- Cache sizing (environment overrides) ---
+MEMORY_ENTRIES = int(os.environ.get("FRAUD_EMBEDDING_CACHE_SIZE", "10000"))
+DB_PATH = os.environ.get("FRAUD_EMBEDDING_CACHE_DB", "")  # empty = no on-disk store
+DB_MAX_ENTRIES = int(os.environ.get("FRAUD_EMBEDDING_CACHE_DB_MAX", "500000"))
+# Disk hits update last_used in batches (one transaction per TOUCH_BATCH hits or TOUCH_FLUSH_SECONDS),
+# not with one write per hit.
+TOUCH_BATCH = 256
+TOUCH_FLUSH_SECONDS = 30.0
+
+
+class EmbeddingCache:
+    """Content-addressed cache of sentence embeddings.
+
+    Keys are sha256(model name + cleaned text), so swapping the embedder model
+    never returns stale vectors. Lookups go to an in-process LRU first and then
+    to an optional SQLite store; both are size-bounded and evict the least
+    recently used vectors. Processes with different embedders may share one
+    store: the other model's vectors never hit and age out like any other.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = MEMORY_ENTRIES,
+                 db_path: Optional[str] = DB_PATH or None, max_db_entries: int = DB_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max(int(max_entries), 0)
+        self.max_db_entries = max(int(max_db_entries), 0)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0}
+        self._db = None
+        self._touched: Dict[str, float] = {}  # key -> last disk hit, not yet written to the store
+        self._touch_flushed = time.monotonic()
+        if db_path:
+            self._open_db(db_path)
+
+    # --- keys ---
+
+    def key(self, cleaned: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{cleaned}".encode("utf-8")).hexdigest()
+
+    # --- on-disk store ---
+
+    def _open_db(self, path: str) -> None:
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, vec BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+
+    def _db_get(self, key: str) -> Optional[np.ndarray]:
+        row = self._db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH or time.monotonic() - self._touch_flushed >= TOUCH_FLUSH_SECONDS:
+            self._flush_touches()
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def _flush_touches(self) -> None:
+        """Writes the pending last_used updates in one transaction."""
+        self._touch_flushed = time.monotonic()
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                 [(t, k) for k, t in touched.items()])
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _db_put(self, items: Dict[str, np.ndarray]) -> None:
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, vec, last_used) VALUES (?, ?, ?, ?)",
+            [(k, self.model_name, np.asarray(v, dtype=np.float32).tobytes(), now) for k, v in items.items()],
+        )
+        overflow = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_db_entries
+        if overflow > 0:
+            self._flush_touches()  # evict by up-to-date recency
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+            self._counters["evictions"] += overflow
+
+    # --- in-process LRU ---
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        if self.max_entries == 0:
+            return
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get(self, cleaned: str) -> Optional[np.ndarray]:
+        key = self.key(cleaned)
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return vec
+            if self._db is not None:
+                vec = self._db_get(key)
+                if vec is not None:
+                    self._remember(key, vec)
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    return vec
+            self._counters["misses"] += 1
+            return None
+
+    def put_many(self, cleaned: List[str], vectors: np.ndarray) -> None:
+        items = {self.key(c): np.asarray(v, dtype=np.float32) for c, v in zip(cleaned, vectors)}
+        with self._lock:
+            for k, v in items.items():
+                self._remember(k, v)
+            if self._db is not None and items:
+                self._db_put(items)
+
+    def encode(self, cleaned: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Embeddings for cleaned texts; only cache misses are passed to encode_fn (in one call)."""
+        found = {c: self.get(c) for c in dict.fromkeys(cleaned)}
+        missing = [c for c, v in found.items() if v is None]
+        if missing:
+            computed = np.asarray(encode_fn(missing), dtype=np.float32)
+            self.put_many(missing, computed)
+            found.update(zip(missing, computed))
+        if not cleaned:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[c] for c in cleaned])
+
+    # --- housekeeping ---
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._counters)
+            out["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                out["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
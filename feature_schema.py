@@ -0,0 +1,88 @@
+import re
+from typing import Any, Dict, Iterable, List
+import numpy as np
+import pandas as pd
+
+# Plain decimal/scientific literals; anything else goes through pd.to_numeric.
+_NUMBER_RE = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+_INT_RE = re.compile(r"[+-]?\d+")
+
+# Value types whose str() is what a one-row frame's .astype(str) gives.
+_PLAIN_TYPES = (str, int, float, bool, np.int64, np.float64, np.bool_)
+
+
+def _to_number(value: Any) -> Any:
+    """pd.to_numeric(errors='coerce').fillna(0) for a single value."""
+    if value is None:
+        return 0.0
+    kind = type(value)
+    if kind in (bool, np.int64) or (kind is int and -2**63 <= value < 2**63):
+        return value
+    if kind in (float, np.float64):
+        return 0.0 if value != value else value
+    if kind is str:
+        if _INT_RE.fullmatch(value) and -2**63 <= int(value) < 2**63:
+            return int(value)
+        if _NUMBER_RE.fullmatch(value):
+            return float(value)
+    return pd.to_numeric(pd.Series([value]), errors="coerce").fillna(0).iloc[0]
+
+
+def _to_text(value: Any) -> str:
+    """fillna("Unknown").astype(str) for a single value."""
+    if value is None:
+        return "Unknown"
+    kind = type(value)
+    if kind in _PLAIN_TYPES:
+        if kind in (float, np.float64) and value != value:
+            return "Unknown"
+        return str(value)
+    return pd.Series([value]).fillna("Unknown").astype(str).iloc[0]
+
+
+class FeatureSchema:
+    """Column layout of one model's input, compiled once per loaded model.
+
+    Holds the column order, which columns are numeric (pd.to_numeric, missing
+    -> 0) and which are text (str, missing -> "Unknown"), and a row of default
+    values. frame(claim) copies that row and fills it straight from the claim
+    dict, giving the same values as _build_input_frame on a one-row DataFrame
+    without the per-column pandas work; records_frame(claims) does the same
+    for a few claims at once.
+    """
+
+    def __init__(self, columns: Iterable[str], numeric_cols: Iterable[str]):
+        self.columns: List[str] = list(columns)
+        numeric = set(numeric_cols)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self.numeric = [(i, c) for i, c in enumerate(self.columns) if c in numeric]
+        self.text = [(i, c) for i, c in enumerate(self.columns) if c not in numeric]
+        self.defaults = np.empty((1, len(self.columns)), dtype=object)
+        for i, _ in self.numeric:
+            self.defaults[0, i] = 0.0
+        for i, _ in self.text:
+            self.defaults[0, i] = "Unknown"
+
+    @classmethod
+    def from_model(cls, model: Any, numeric_cols: Iterable[str]) -> "FeatureSchema":
+        """Schema for a fitted model/pipeline; raises AttributeError without feature_names_in_."""
+        return cls(model.feature_names_in_, numeric_cols)
+
+    def row(self, claim: Dict[str, Any]) -> np.ndarray:
+        """(1, n_columns) object buffer filled from claim."""
+        buf = self.defaults.copy()
+        for i, c in self.numeric:
+            if c in claim:
+                buf[0, i] = _to_number(claim[c])
+        for i, c in self.text:
+            if c in claim:
+                buf[0, i] = _to_text(claim[c])
+        return buf
+
+    def frame(self, claim: Dict[str, Any]) -> pd.DataFrame:
+        return pd.DataFrame(self.row(claim), columns=self.columns, copy=False)
+
+    def records_frame(self, claims: List[Dict[str, Any]]) -> pd.DataFrame:
+        """One row() per claim, stacked into one frame (for a few claims, e.g. a micro-batch)."""
+        rows = np.vstack([self.row(claim) for claim in claims]) if claims else self.defaults[:0]
+        return pd.DataFrame(rows, columns=self.columns, copy=False)
@@ -1,14 +1,99 @@
-import joblib, re, numpy as np, pandas as pd
-from sentence_transformers import SentenceTransformer
-from typing import Dict, Any
+import functools, hashlib, os, re, threading, time, multiprocessing as mp, numpy as np, pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Dict, Any, Iterable, List, NamedTuple, Optional, Sequence
+import compiled_models
+from claim_features import ENGINEERED_FEATURES, engineer_features
+from embedding_cache import EmbeddingCache
+from feature_schema import FeatureSchema
+from instrumentation import Gauge, count, profiled, profiled_call, register, stage
+from model_registry import MMAP_MODE, MODEL_DIR, ArtifactLoadError, ModelRegistry, file_signature
+from model_releases import MANIFEST_FILE, Release, ReleaseManager, copy_release, read_manifest
+from result_cache import ResultCache
 # Note: The presence of a working pipeline implies ColumnTransformer/Pipeline is handled by the model object.
 
-# ----- load models (will raise on import if missing) -----
-final_model = joblib.load("fraud_detection_model.joblib")
-text_model = joblib.load("text_model.joblib")
-model_gbc = joblib.load("gbcmodel.joblib") # Renamed from gbc_model to model_gbc for consistency
-model_lr = joblib.load("logisticregression.joblib") # Renamed from lr_model to model_lr for consistency
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+# ----- models are loaded lazily on first use and memoized (see model_registry), per release (see model_releases) -----
+EMBEDDER_NAME = "all-MiniLM-L6-v2"
+
+# --- Embedding throughput settings (environment overrides) ---
+EMBED_BATCH_SIZE = int(os.environ.get("FRAUD_EMBED_BATCH_SIZE", "64"))
+EMBED_WORKERS = max(int(os.environ.get("FRAUD_EMBED_WORKERS", "2")), 1)
+# Native threads per BLAS/OpenMP (threadpoolctl) and torch call; 0 = split the cores between the pool's workers
+NATIVE_THREADS = int(os.environ.get("FRAUD_NATIVE_THREADS", "0"))
+# torch intra-op threads; by default FRAUD_NATIVE_THREADS, else the cores split between the encode workers
+TORCH_THREADS = (int(os.environ.get("FRAUD_TORCH_THREADS", "0")) or NATIVE_THREADS
+                 or max((os.cpu_count() or 1) // EMBED_WORKERS, 1))
+
+# Text Suspicion Score backend:
+#   "minilm"      sentence embeddings (fp32 torch) + text_model
+#   "minilm-int8" the same encoder with its Linear layers dynamically quantized to int8 + text_model
+#   "hashed"      hashed word/char n-gram TF-IDF regressor distilled from "minilm" (see text_distill.py); no torch
+TEXT_BACKEND = os.environ.get("FRAUD_TEXT_BACKEND", "minilm").lower()
+TEXT_BACKENDS = ("minilm", "minilm-int8", "hashed")
+if TEXT_BACKEND not in TEXT_BACKENDS:
+    raise ValueError(f"FRAUD_TEXT_BACKEND must be one of {TEXT_BACKENDS}, got {TEXT_BACKEND!r}")
+HASHED_TEXT_MODEL_FILE = "text_model_hashed.joblib"
+
+def _load_embedder():
+    # transformers would otherwise import TensorFlow too when it is installed; inference only needs torch.
+    os.environ.setdefault("USE_TF", "0")
+    os.environ.setdefault("TRANSFORMERS_NO_TF", "1")
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(TORCH_THREADS)
+    embedder = SentenceTransformer(EMBEDDER_NAME)
+    if TEXT_BACKEND == "minilm-int8":
+        embedder = torch.quantization.quantize_dynamic(embedder, {torch.nn.Linear}, dtype=torch.qint8)
+    return embedder
+
+# "sklearn" (the joblib pipelines) or "compiled" (NumPy evaluators written by `python compiled_models.py export`)
+MODEL_BACKEND = os.environ.get("FRAUD_MODEL_BACKEND", "sklearn").lower()
+
+# Tabular ensemble artifacts (registry name -> joblib file); a release manifest's "files" can rename them
+ENSEMBLE_FILES = {
+    "final_model": "fraud_detection_model.joblib",
+    "model_gbc": "gbcmodel.joblib", # Renamed from gbc_model to model_gbc for consistency
+    "model_lr": "logisticregression.joblib", # Renamed from lr_model to model_lr for consistency
+}
+TEXT_MODEL_FILE = "text_model.joblib"
+
+# The sentence encoder is not part of a release: every release shares this one copy.
+_shared_artifacts = ModelRegistry()
+_shared_artifacts.register("embedder", _load_embedder)
+
+def _release_registry(directory: str, files: Dict[str, str]) -> ModelRegistry:
+    """Artifacts of one release directory (registry name -> file in files), loaded on first use."""
+    registry = ModelRegistry(directory)
+    for name in ENSEMBLE_FILES:
+        if MODEL_BACKEND == "compiled":
+            path = compiled_models.compiled_path(registry.path(files[name]))
+            registry.register(name, lambda path=path: compiled_models.load(path, mmap_mode=MMAP_MODE), path)
+        else:
+            registry.register_joblib(name, files[name])
+    if TEXT_BACKEND == "hashed":
+        registry.register_joblib("text_model_hashed", files["text_model_hashed"])
+    else:
+        registry.register_joblib("text_model", files["text_model"])
+        registry.register("embedder", lambda: _shared_artifacts.get("embedder"))
+    return registry
+
+# Ensemble member -> registry artifact
+ENSEMBLE_ARTIFACTS = {"RFC": "final_model", "LR": "model_lr", "GBC": "model_gbc"}
+
+def __getattr__(name: str) -> Any:
+    # Keeps fraudriskscore_final.final_model / text_model / ... working (loaded on first access), and
+    # MODEL_THRESHOLDS / GLOBAL_THRESHOLD, which now come from the active release.
+    release = releases.active()
+    if name == "MODEL_THRESHOLDS":
+        return dict(release.thresholds)
+    if name == "GLOBAL_THRESHOLD":
+        return release.global_threshold
+    if name in release.registry.names():
+        return release.registry.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Claim-description embeddings keyed on (encoder variant, clean_text output)
+embedding_cache = EmbeddingCache(EMBEDDER_NAME + ("+int8" if TEXT_BACKEND == "minilm-int8" else ""))
 
 # --- Model Input Feature Definition (Used for alignment and fillna) ---
 NUMERIC_COLS = [
@@ -28,16 +113,129 @@ CATEGORICAL_COLS = [
     'auto_make', 'auto_model'
 ]
 
-# threshold (optional)
-try:
-    with open("finalthresholdvalue.txt") as f:
-        GLOBAL_THRESHOLD = float(f.read().strip())
-except:
-    GLOBAL_THRESHOLD = 0.2
+# --- DEFINITIVE LIST OF REQUIRED USER INPUT COLUMNS (Including ID/text for context) ---
+REQUIRED_INPUT_COLUMNS = [
+    "months_as_customer", "age", "policy_number", "policy_bind_date", "policy_state",
+    "policy_csl", "policy_deductable", "policy_annual_premium", "umbrella_limit", 
+    "insured_zip", "insured_sex", "insured_education_level", "insured_occupation", 
+    "insured_hobbies", "insured_relationship", "capital-gains", "capital-loss", 
+    "incident_date", "incident_type", "collision_type", "incident_severity", 
+    "authorities_contacted", "incident_state", "incident_city", "incident_location", 
+    "incident_hour_of_the_day", "number_of_vehicles_involved", "property_damage", 
+    "bodily_injuries", "witnesses", "police_report_available", "total_claim_amount", 
+    "injury_claim", "property_claim", "vehicle_claim", "auto_make", "auto_model", 
+    "auto_year", "claim_description"
+    # Note: Engineered features (ratios, flags, daysdiff) are generated by the app, 
+    # but providing them in the CSV (if available) is safe due to the feature recalculation in process_claims_batch (batch_io).
+]
+# --------------------------------------------------------------------------------------
+
+# threshold (optional): read per release unless its manifest sets "global_threshold"
+THRESHOLD_FILE = "finalthresholdvalue.txt"
+
+def _read_threshold_file(path: str) -> float:
+    try:
+        with open(path) as f:
+            return float(f.read().strip())
+    except Exception:
+        return 0.2
 
 # small debug flag (switch to True to print df/dtypes into logs)
 _DEBUG = False
 
+# --- Per-model strategic thresholds: (THRESHOLD, HIGH_RISK_LIMIT) ---
+# Used when a release manifest has no "thresholds"; MODEL_THRESHOLDS resolves to the active release's.
+DEFAULT_MODEL_THRESHOLDS = {
+    "RFC": (0.20, 0.50),
+    "LR": (0.50, 0.70),
+    "GBC": (0.30, 0.60),
+}
+
+# Order matters: ties on the rounded score go to the first model (RFC, then LR, then GBC).
+ENSEMBLE_ORDER = ("RFC", "LR", "GBC")
+
+# --- MODEL RELEASES (versioned artifact directories with a manifest, hot-swapped; see model_releases) ---
+
+def _release_thresholds(manifest: Dict[str, Any]) -> Dict[str, tuple]:
+    """(THRESHOLD, HIGH_RISK_LIMIT) per model from a manifest, defaulting to DEFAULT_MODEL_THRESHOLDS."""
+    given = manifest.get("thresholds", {})
+    unknown = set(given) - set(ENSEMBLE_ORDER)
+    if unknown:
+        raise ValueError(f"manifest thresholds for unknown models {sorted(unknown)}")
+    thresholds = {}
+    for name in ENSEMBLE_ORDER:
+        threshold, high_risk_limit = (float(v) for v in given.get(name, DEFAULT_MODEL_THRESHOLDS[name]))
+        if not 0.0 <= threshold <= high_risk_limit <= 1.0:
+            raise ValueError(f"manifest thresholds for {name} need 0 <= threshold <= high risk limit <= 1")
+        thresholds[name] = (threshold, high_risk_limit)
+    return thresholds
+
+def _build_release(directory: str, manifest: Dict[str, Any]) -> Release:
+    """Registers a release's artifacts (not loaded yet) and resolves its thresholds and version."""
+    files = {**ENSEMBLE_FILES, "text_model": TEXT_MODEL_FILE, "text_model_hashed": HASHED_TEXT_MODEL_FILE}
+    unknown = set(manifest.get("files", {})) - set(files)
+    if unknown:
+        raise ValueError(f"manifest files for unknown artifacts {sorted(unknown)}")
+    files.update(manifest.get("files", {}))
+    registry = _release_registry(directory, files)
+
+    # The flat model directory keeps reading finalthresholdvalue.txt from the working directory, as before.
+    flat = directory == MODEL_DIR
+    threshold_file = THRESHOLD_FILE if flat else os.path.join(directory, THRESHOLD_FILE)
+    global_threshold = (float(manifest["global_threshold"]) if "global_threshold" in manifest
+                        else _read_threshold_file(threshold_file))
+    watch = [*registry.file_paths().values(), os.path.join(directory, MANIFEST_FILE), threshold_file]
+    version = manifest.get("version")
+    if not version:
+        version = ("local-" + hashlib.sha256(repr([file_signature(p) for p in watch]).encode()).hexdigest()[:12]
+                   if flat else os.path.basename(directory))
+    return Release(str(version), directory, registry, _release_thresholds(manifest), global_threshold, files, watch)
+
+releases = ReleaseManager(_build_release)
+# Artifacts of the release in use: the one pinned by the running request, else the live one.
+registry = releases.registry
+
+def stage_release(target: str) -> Dict[str, str]:
+    """Stages a copy of the live release (with its compiled models) in target; {artifact: path in target}.
+
+    New artifacts are written there and released with `python model_releases.py publish target`,
+    never into a live release directory.
+    """
+    release = releases.current()
+    copy_release(release, target, [compiled_models.compiled_path(release.files[name]) for name in ENSEMBLE_FILES])
+    files = {**release.files, **read_manifest(target).get("files", {})}
+    return {name: os.path.join(target, filename) for name, filename in files.items()}
+
+# Claim keys searched (in order) for the free-text description.
+TEXT_KEYS = ("claim_description", "adjuster_notes", "notes", "text_all")
+
+# Rows scored per predict_proba call in score_batch.
+BATCH_CHUNK_SIZE = 2048
+
+# score_batch chunks up to this many rows (single claims, micro-batches) are aligned row by row from the
+# compiled FeatureSchema; larger ones column-wise with pandas (_build_input_frame).
+SCHEMA_MAX_ROWS = int(os.environ.get("FRAUD_SCHEMA_MAX_ROWS", "64"))
+
+# score_batch process pool: worker count and the input size below which scoring stays in-process.
+BATCH_WORKERS = max(int(os.environ.get("FRAUD_BATCH_WORKERS", "0")) or (os.cpu_count() or 1), 1)
+PARALLEL_MIN_ROWS = int(os.environ.get("FRAUD_PARALLEL_MIN_ROWS", "5000"))
+
+# Single-claim scoring: threads evaluating RFC/LR/GBC concurrently (1 = one after another; default one
+# per model, at most one per core) and the seconds to wait for all three before giving up.
+ENSEMBLE_WORKERS = max(int(os.environ.get("FRAUD_ENSEMBLE_WORKERS", "0"))
+                       or min(len(ENSEMBLE_ORDER), os.cpu_count() or 1), 1)
+ENSEMBLE_TIMEOUT = float(os.environ.get("FRAUD_ENSEMBLE_TIMEOUT", "30"))
+# score_batch chunks up to this many rows (single claims, micro-batches) also evaluate the models on that pool.
+ENSEMBLE_CONCURRENT_ROWS = int(os.environ.get("FRAUD_ENSEMBLE_CONCURRENT_ROWS", "64"))
+
+# Opt-in cascade: evaluate the models cheapest first and skip the rest once the final risk tier is settled.
+ENSEMBLE_CASCADE = os.environ.get("FRAUD_ENSEMBLE_CASCADE", "0").lower() in ("1", "true", "yes")
+CASCADE_ORDER = tuple(n.strip().upper() for n in os.environ.get("FRAUD_CASCADE_ORDER", "LR,GBC,RFC").split(",") if n.strip())
+if sorted(CASCADE_ORDER) != sorted(ENSEMBLE_ORDER):
+    raise ValueError(f"FRAUD_CASCADE_ORDER must list each of {ENSEMBLE_ORDER} once, got {CASCADE_ORDER}")
+# A model that beats a rounded score r scored at least r - 0.00005; the margin is kept a little wider.
+CASCADE_MARGIN = 1e-4
+
 # --- SHARED HELPERS (UNCHANGED) ---
 
 def clean_text(t: Any) -> str:
@@ -47,16 +245,20 @@ def clean_text(t: Any) -> str:
     s = " ".join(s.split()).strip().lower()
     return s
 
-def _build_input_df(claim: Dict[str, Any]) -> pd.DataFrame:
-    """Uses the original, working feature alignment/imputation logic."""
-    df = pd.DataFrame([claim])
+def _build_input_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Column-wise feature alignment/imputation; one row per claim, same rules as _build_input_df."""
+    with stage("frame_building"):
+        return _align_frame(df)
+
+def _align_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
 
     if "text_suspicion_score" not in df.columns:
         df["text_suspicion_score"] = np.nan
 
     # Get the feature list the model *actually* expects
     try:
-        expected_features = list(final_model.feature_names_in_)
+        expected_features = list(registry.get("final_model").feature_names_in_)
     except Exception:
         expected_features = [c for c in (NUMERIC_COLS + CATEGORICAL_COLS) if c in df.columns]
 
@@ -77,6 +279,36 @@ def _build_input_df(claim: Dict[str, Any]) -> pd.DataFrame:
             
     return df
 
+_schemas: Dict[str, tuple] = {}  # artifact name -> (model object, FeatureSchema)
+
+def feature_schema(name: str = "final_model") -> Optional[FeatureSchema]:
+    """Input schema of a registry model, compiled once per loaded model (None if it has no feature_names_in_)."""
+    try:
+        model = registry.get(name)
+        cached = _schemas.get(name)
+        if cached is None or cached[0] is not model:
+            cached = _schemas[name] = (model, FeatureSchema.from_model(model, NUMERIC_COLS))
+        return cached[1]
+    except Exception:
+        return None
+
+def _build_input_df(claim: Dict[str, Any]) -> pd.DataFrame:
+    """One-row aligned frame filled from the compiled feature schema (same values as _build_input_frame)."""
+    schema = feature_schema()
+    if schema is None:
+        # No usable schema: original alignment (columns depend on the claim)
+        return _build_input_frame(pd.DataFrame([claim]))
+    with stage("frame_building"):
+        return schema.frame(claim)
+
+def _aligned_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Aligned model input for a claims frame; up to SCHEMA_MAX_ROWS rows come from the feature schema."""
+    schema = feature_schema() if len(df) <= SCHEMA_MAX_ROWS else None
+    if schema is None:
+        return _build_input_frame(df)
+    with stage("frame_building"):
+        return schema.records_frame(df.to_dict("records"))
+
 def _apply_threshold_logic(proba: float, threshold: float, high_risk_limit: float) -> tuple[str, str]:
     """Applies standardized risk tier logic."""
     if proba < threshold:
@@ -90,102 +322,313 @@ def _apply_threshold_logic(proba: float, threshold: float, high_risk_limit: floa
         decision = "Flagged as Potential Fraud."
     return risk, decision
 
-def _calculate_base_score(claim: Dict[str, Any], model: Any) -> tuple[float, float]:
-    """Calculates text score and final prediction probability for any given model."""
-    
-    # 1. Extract text and calculate Text Suspicion Score
-    text = ""
-    for key in ("claim_description","adjuster_notes","notes","text_all"):
+def _extract_text(claim: Dict[str, Any]) -> Any:
+    """Returns the first non-empty free-text field of a claim (or "")."""
+    for key in TEXT_KEYS:
         if key in claim and claim[key] not in (None, ""):
-            text = claim[key]
-            break
-            
-    cleaned = clean_text(text)
-    text_score = 0.0
-    if cleaned != "":
-        try:
-            emb = embedder.encode([cleaned], show_progress_bar=False)
-            emb = np.asarray(emb)
-            if hasattr(text_model, "predict_proba"):
-                text_score = float(text_model.predict_proba(emb)[:, 1][0])
-            else:
-                text_score = float(text_model.predict(emb)[0])
-        except Exception:
-            text_score = 0.0
-
-    # 2. Build and Align DataFrame (Uses the working, original data prep)
-    df = _build_input_df(claim)
-
-    # 3. Assign the calculated text_suspicion_score
-    if "text_suspicion_score" in df.columns:
-        df["text_suspicion_score"] = text_score
+            return claim[key]
+    return ""
 
-    # 4. Predict
+_encode_pool: Optional[ThreadPoolExecutor] = None
+_encode_pool_lock = threading.Lock()
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is None:
+            _encode_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+        return _encode_pool
+
+_ensemble_pool: Optional[ThreadPoolExecutor] = None
+_ensemble_pool_lock = threading.Lock()
+
+def _get_ensemble_pool() -> ThreadPoolExecutor:
+    global _ensemble_pool
+    with _ensemble_pool_lock:
+        if _ensemble_pool is None:
+            _limit_native_threads(NATIVE_THREADS or max((os.cpu_count() or 1) // ENSEMBLE_WORKERS, 1))
+            _ensemble_pool = ThreadPoolExecutor(max_workers=ENSEMBLE_WORKERS, thread_name_prefix="ensemble")
+        return _ensemble_pool
+
+def _limit_native_threads(threads: int) -> None:
+    """Caps the BLAS/OpenMP thread pools (process-wide) so concurrent model calls don't oversubscribe the cores."""
     try:
-        proba = float(model.predict_proba(df)[0, 1])
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=threads)
+
+def _encode_batched(cleaned: list) -> np.ndarray:
+    """Encodes texts in EMBED_BATCH_SIZE batches of similar length on the bounded encode pool."""
+    with stage("embedding"):
+        return _encode(cleaned)
+
+def _encode(cleaned: list) -> np.ndarray:
+    embedder = registry.get("embedder")
+    if len(cleaned) <= EMBED_BATCH_SIZE:
+        return np.asarray(embedder.encode(cleaned, batch_size=EMBED_BATCH_SIZE, show_progress_bar=False))
+
+    # Length buckets: sorting by length keeps padding inside each batch small.
+    order = sorted(range(len(cleaned)), key=lambda i: len(cleaned[i]))
+    batches = [order[i:i + EMBED_BATCH_SIZE] for i in range(0, len(order), EMBED_BATCH_SIZE)]
+
+    def encode(batch: list) -> np.ndarray:
+        return np.asarray(embedder.encode([cleaned[i] for i in batch], batch_size=EMBED_BATCH_SIZE,
+                                          show_progress_bar=False))
+
+    out = None
+    futures = [_get_encode_pool().submit(copy_context().run, profiled_call, encode, batch) for batch in batches]
+    for batch, emb in zip(batches, (future.result() for future in futures)):
+        if out is None:
+            out = np.empty((len(cleaned), emb.shape[1]), dtype=emb.dtype)
+        out[batch] = emb
+    return out
+
+def _embed(cleaned: list) -> np.ndarray:
+    """Sentence embeddings for cleaned texts, served from embedding_cache when possible."""
+    return embedding_cache.encode(cleaned, _encode_batched)
+
+def _text_model_scores(emb: np.ndarray) -> np.ndarray:
+    text_model = registry.get("text_model")
+    with stage("text_model"):
+        if hasattr(text_model, "predict_proba"):
+            return np.asarray(text_model.predict_proba(emb)[:, 1], dtype=float)
+        return np.asarray(text_model.predict(emb), dtype=float)
+
+def _hashed_text_scores(cleaned: list) -> np.ndarray:
+    text_model = registry.get("text_model_hashed")
+    with stage("text_model"):
+        return np.clip(np.asarray(text_model.predict(cleaned), dtype=float), 0.0, 1.0)
+
+def _score_texts(cleaned: list) -> np.ndarray:
+    """Text Suspicion Scores for non-empty cleaned descriptions with the configured TEXT_BACKEND."""
+    if TEXT_BACKEND == "hashed":
+        return _hashed_text_scores(cleaned)
+    return _text_model_scores(_embed(cleaned))
+
+def _load_text_model() -> Any:
+    """The TEXT_BACKEND's text model (ArtifactLoadError when it cannot be loaded)."""
+    return registry.get("text_model_hashed" if TEXT_BACKEND == "hashed" else "text_model")
+
+def _text_score(cleaned: str) -> float:
+    """Text Suspicion Score for one cleaned description (0.0 when empty or when scoring it fails).
+
+    A text model or embedder that cannot be loaded raises ArtifactLoadError instead.
+    """
+    if cleaned == "":
+        return 0.0
+    _load_text_model()
+    try:
+        return float(_score_texts([cleaned])[0])
+    except ArtifactLoadError:
+        raise  # the embedder is loaded lazily, on the first cache miss
+    except Exception:
+        return 0.0
+
+def _text_scores_for_cleaned(cleaned: list) -> np.ndarray:
+    """Text Suspicion Scores for cleaned descriptions; each distinct text is encoded once."""
+    unique = [c for c in dict.fromkeys(cleaned) if c != ""]
+    if not unique:
+        return np.zeros(len(cleaned), dtype=float)
+    _load_text_model()
+    try:
+        unique_scores = _score_texts(unique)
+    except ArtifactLoadError:
+        raise
+    except Exception:
+        # Isolate the failing descriptions; they score 0.0 as in the single-claim path.
+        unique_scores = [_text_score(c) for c in unique]
+    lookup = dict(zip(unique, unique_scores))
+    return np.array([lookup.get(c, 0.0) for c in cleaned], dtype=float)
+
+def text_suspicion_scores(texts: Iterable[Any]) -> np.ndarray:
+    """Text Suspicion Score for each raw description, aligned to the input order.
+
+    Descriptions are cleaned and deduplicated, then encoded in length-bucketed
+    batches (EMBED_BATCH_SIZE) on a bounded thread pool (EMBED_WORKERS);
+    empty descriptions score 0.0. ArtifactLoadError when the text model or
+    embedder cannot be loaded.
+    """
+    with stage("text_cleaning"):
+        cleaned = [clean_text(t) for t in texts]
+    return _text_scores_for_cleaned(cleaned)
+
+def _predict_proba(model: Any, df: pd.DataFrame, name: str = "model") -> np.ndarray:
+    """Positive-class probabilities for every row of an aligned frame (timed as classifier_<name>)."""
+    try:
+        with stage(f"classifier_{name}"):
+            return np.asarray(model.predict_proba(df)[:, 1], dtype=float)
     except Exception as e:
         # Re-raise the error with the model type
         raise RuntimeError(f"{type(model).__name__} prediction error: {e}")
 
-    return proba, text_score
+class PreparedClaim(NamedTuple):
+    """Model-independent part of scoring one claim, shared by all three models."""
+    frame: pd.DataFrame
+    text_score: float
+
+def prepare_claim(claim: Dict[str, Any]) -> PreparedClaim:
+    """Computes the Text Suspicion Score and the aligned feature frame once per claim."""
+
+    # 1. Extract text and calculate Text Suspicion Score
+    text = _extract_text(claim)
+    with stage("text_cleaning"):
+        cleaned = clean_text(text)
+    text_score = _text_score(cleaned)
+
+    # 2. Build and Align DataFrame, with the calculated text_suspicion_score
+    df = _build_input_df({**claim, "text_suspicion_score": text_score})
+
+    return PreparedClaim(df, text_score)
+
+# --- RESULT CACHE (ensemble results keyed on model input + cleaned description + model version) ---
+
+def _model_version(release: Optional[Release] = None) -> str:
+    """Token of a release (default: the active one) and the scoring backends; changes with any artifact or threshold."""
+    release = release or releases.active()
+    state = (EMBEDDER_NAME, TEXT_BACKEND, MODEL_BACKEND, sorted(release.thresholds.items()), ENSEMBLE_ORDER,
+             release.version, release.signature)
+    return hashlib.sha256(repr(state).encode()).hexdigest()[:16]
+
+result_cache = ResultCache(version_fn=lambda: _model_version(releases.current()))
+register("fraud_result_cache_hits", Gauge(lambda: result_cache.hits), "Result cache hits since start")
+register("fraud_result_cache_misses", Gauge(lambda: result_cache.misses), "Result cache misses since start")
+register("fraud_result_cache_entries", Gauge(lambda: len(result_cache)), "Cached claim results")
+
+def _key_positions(schema: FeatureSchema) -> tuple[list, list]:
+    # text_suspicion_score is derived from the description, which is keyed separately
+    numeric = [i for i, c in schema.numeric if c != "text_suspicion_score"]
+    return numeric, [i for i, _ in schema.text]
+
+def _result_key(version: str, numeric: np.ndarray, texts: Iterable[str], cleaned: str) -> str:
+    """sha256 over the normalized model input: numeric features as float64, text features as str."""
+    h = hashlib.sha256(version.encode())
+    h.update(np.ascontiguousarray(numeric, dtype=np.float64).tobytes())
+    h.update(repr((tuple(texts), cleaned)).encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+def _key_version() -> str:
+    """Version mixed into result keys: that of the release the request is pinned to."""
+    result_cache.version  # lets the cache notice a release swap and drop the old release's results
+    return _model_version()
+
+def _claim_result_key(claim: Dict[str, Any]) -> Optional[str]:
+    """Cache key of one claim dict (None when caching is off or the model has no schema)."""
+    schema = feature_schema() if result_cache.enabled else None
+    if schema is None:
+        return None
+    row = schema.row(claim)[0]
+    numeric, text = _key_positions(schema)
+    return _result_key(_key_version(), np.array([row[i] for i in numeric], dtype=np.float64),
+                       [row[i] for i in text], clean_text(_extract_text(claim)))
+
+def _frame_result_keys(df: pd.DataFrame) -> Optional[list]:
+    """Cache keys for every row of an engineered claims frame (same keys as _claim_result_key)."""
+    schema = feature_schema() if result_cache.enabled else None
+    if schema is None:
+        return None
+    frame = _aligned_frame(df)
+    if list(frame.columns) != schema.columns:
+        return None
+    numeric, text = _key_positions(schema)
+    values = frame.iloc[:, numeric].to_numpy(dtype=np.float64)
+    texts = frame.iloc[:, text].to_numpy(dtype=object)
+    cleaned = [clean_text(t) for t in _extract_texts(df)]
+    version = _key_version()
+    return [_result_key(version, values[i], texts[i], cleaned[i]) for i in range(len(frame))]
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {**result, "model_scores": dict(result["model_scores"])}
+
+def _calculate_base_score(claim: Dict[str, Any], model: Any,
+                          prepared: Optional[PreparedClaim] = None, name: str = "model") -> tuple[float, float]:
+    """Calculates text score and final prediction probability for any given model."""
+    if prepared is None:
+        prepared = prepare_claim(claim)
+
+    # 4. Predict
+    proba = float(_predict_proba(model, prepared.frame, name)[0])
+
+    return proba, prepared.text_score
 
 # --- 4. FINAL SCORING FUNCTIONS (One for Each Strategic Model) ---
 
-def fraudriskscore_RFC(claim: Dict[str, Any]) -> Dict[str, Any]:
+def fraudriskscore_RFC(claim: Dict[str, Any], prepared: Optional[PreparedClaim] = None) -> Dict[str, Any]:
     """Scores a claim using the Random Forest Classifier (Safety Net) model."""
-    proba, text_score = _calculate_base_score(claim, final_model)
+    with releases.pinned() as release:
+        proba, text_score = _calculate_base_score(claim, release.registry.get("final_model"), prepared, "RFC")
     
-    # RFC Strategic Thresholds
-    THRESHOLD = 0.20 
-    HIGH_RISK_LIMIT = 0.50
+    # RFC Strategic Thresholds (from the release manifest)
+    THRESHOLD, HIGH_RISK_LIMIT = release.thresholds["RFC"]
     risk, decision = _apply_threshold_logic(proba, THRESHOLD, HIGH_RISK_LIMIT)
 
     return {"fraud_risk_score": round(proba, 4),
             "text_suspicion_score": round(text_score, 4),
             "risk_level": risk,
             "decision": decision,
-            "threshold_used": THRESHOLD}
+            "threshold_used": THRESHOLD,
+            "model_version": release.version}
 
 
-def fraudriskscore_LR(claim: Dict[str, Any]) -> Dict[str, Any]:
+def fraudriskscore_LR(claim: Dict[str, Any], prepared: Optional[PreparedClaim] = None) -> Dict[str, Any]:
     """Scores a claim using the Logistic Regression (Baseline) model."""
-    proba, text_score = _calculate_base_score(claim, model_lr)
+    with releases.pinned() as release:
+        proba, text_score = _calculate_base_score(claim, release.registry.get("model_lr"), prepared, "LR")
     
-    # LR Strategic Thresholds (Set to match analysis)
-    THRESHOLD = 0.50 
-    HIGH_RISK_LIMIT = 0.70 
+    # LR Strategic Thresholds (from the release manifest)
+    THRESHOLD, HIGH_RISK_LIMIT = release.thresholds["LR"]
     risk, decision = _apply_threshold_logic(proba, THRESHOLD, HIGH_RISK_LIMIT)
 
     return {"fraud_risk_score": round(proba, 4),
             "text_suspicion_score": round(text_score, 4),
             "risk_level": risk,
             "decision": decision,
-            "threshold_used": THRESHOLD}
+            "threshold_used": THRESHOLD,
+            "model_version": release.version}
 
 
-def fraudriskscore_GBC(claim: Dict[str, Any]) -> Dict[str, Any]:
+def fraudriskscore_GBC(claim: Dict[str, Any], prepared: Optional[PreparedClaim] = None) -> Dict[str, Any]:
     """Scores a claim using the GBC (Operational High Recall) model."""
-    proba, text_score = _calculate_base_score(claim, model_gbc)
+    with releases.pinned() as release:
+        proba, text_score = _calculate_base_score(claim, release.registry.get("model_gbc"), prepared, "GBC")
     
-    # GBC Strategic Thresholds (Set to match analysis)
-    THRESHOLD = 0.30 
-    HIGH_RISK_LIMIT = 0.60 
+    # GBC Strategic Thresholds (from the release manifest)
+    THRESHOLD, HIGH_RISK_LIMIT = release.thresholds["GBC"]
     risk, decision = _apply_threshold_logic(proba, THRESHOLD, HIGH_RISK_LIMIT)
 
     return {"fraud_risk_score": round(proba, 4),
             "text_suspicion_score": round(text_score, 4),
             "risk_level": risk,
             "decision": decision,
-            "threshold_used": THRESHOLD}
+            "threshold_used": THRESHOLD,
+            "model_version": release.version}
 
 fraudriskscore_final=fraudriskscore_RFC
 
 def fraudriskscore_ensemble(claim: Dict[str, Any]) -> Dict[str, Any]:
-    result_rfc = fraudriskscore_RFC(claim)
-    result_lr = fraudriskscore_LR(claim)
-    result_gbc = fraudriskscore_GBC(claim)
+    # The whole claim is scored with the release that is live now, even if a new one goes live meanwhile.
+    with profiled("ensemble"), stage("ensemble"), releases.pinned():
+        count("fraud_claims_scored_total", help="Claims scored")
+        key = _claim_result_key(claim)
+        if key is not None:
+            cached = result_cache.get(key)
+            if cached is not None:
+                return _copy_result(cached)
+        result = _ensemble(claim)
+        if key is not None and "model_scores" in result and not result.get("skipped_models"):
+            result_cache.put(key, _copy_result(result))
+        return result
+
+def _ensemble(claim: Dict[str, Any]) -> Dict[str, Any]:
+    # Text embedding and feature alignment are model-independent: do them once.
+    prepared = prepare_claim(claim)
+
+    if ENSEMBLE_CASCADE:
+        results = _score_models_cascade(claim, prepared)
+    else:
+        results = dict(zip(ENSEMBLE_ORDER, _score_models(claim, prepared)))
     
-    resultdicts = [result_rfc, result_lr, result_gbc]
+    resultdicts = [results[name] for name in ENSEMBLE_ORDER if name in results]
     
     max_score = -1
     max_result = None
@@ -197,7 +640,8 @@ def fraudriskscore_ensemble(claim: Dict[str, Any]) -> Dict[str, Any]:
             max_result = resdict
             
     if max_result is None:
-        return {"fraud_risk_score": 0.0, "risk_level": "Error", "decision": "Process Failed"}
+        return {"fraud_risk_score": 0.0, "risk_level": "Error", "decision": "Process Failed",
+                "model_version": releases.active().version}
         
     final_ensemble_result = {
         "fraud_risk_score": max_result['fraud_risk_score'],
@@ -206,13 +650,348 @@ def fraudriskscore_ensemble(claim: Dict[str, Any]) -> Dict[str, Any]:
         "decision": max_result['decision'],
         #"source_model": max_result['model'],
         #"all_model_results": {resdict['model']: resdict for resdict in resultdicts}
-        "model_scores": {
-            "RFC": result_rfc['fraud_risk_score'],
-            "LR": result_lr['fraud_risk_score'],
-            "GBC": result_gbc['fraud_risk_score'],
-        }
+        "model_scores": {name: results[name]['fraud_risk_score'] for name in ENSEMBLE_ORDER if name in results},
+        "model_version": max_result['model_version'],
     }
+    skipped = [name for name in ENSEMBLE_ORDER if name not in results]
+    if skipped:
+        final_ensemble_result["skipped_models"] = skipped
     
     return final_ensemble_result
 
+def _cascade_settled(top_score: Any, top_is_high: Any, remaining: Sequence[str]) -> Any:
+    """Whether the max-score risk tier can no longer change (scalars or row arrays).
+
+    Only High is final: any remaining model that beats top_score scored at least
+    top_score - CASCADE_MARGIN, which must already be High for that model.
+    """
+    thresholds = releases.active().thresholds
+    limit = max(thresholds[name][1] for name in remaining)
+    return top_is_high & (top_score - CASCADE_MARGIN >= limit)
+
+def _score_models_cascade(claim: Dict[str, Any], prepared: PreparedClaim) -> Dict[str, Dict[str, Any]]:
+    """Model results in CASCADE_ORDER until the final risk tier is settled; skipped models are left out."""
+    scorers = {"RFC": fraudriskscore_RFC, "LR": fraudriskscore_LR, "GBC": fraudriskscore_GBC}
+    results: Dict[str, Dict[str, Any]] = {}
+    for i, name in enumerate(CASCADE_ORDER):
+        results[name] = scorers[name](claim, prepared)
+        remaining = CASCADE_ORDER[i + 1:]
+        if not remaining:
+            break
+        # max() keeps the first of equal scores, so walking ENSEMBLE_ORDER breaks ties like the full ensemble
+        top = max((results[n] for n in ENSEMBLE_ORDER if n in results), key=lambda r: r["fraud_risk_score"])
+        if _cascade_settled(top["fraud_risk_score"], top["risk_level"] == "High", remaining):
+            break
+    return results
+
+def _score_models(claim: Dict[str, Any], prepared: PreparedClaim) -> List[Dict[str, Any]]:
+    """RFC, LR and GBC results for one prepared claim, evaluated concurrently on the ensemble pool.
+
+    A model error is raised in ENSEMBLE_ORDER, as if the models had run one after another;
+    TimeoutError if they have not all finished within ENSEMBLE_TIMEOUT seconds.
+    """
+    scorers = (fraudriskscore_RFC, fraudriskscore_LR, fraudriskscore_GBC)
+    if ENSEMBLE_WORKERS <= 1:
+        return [scorer(claim, prepared) for scorer in scorers]
+    return _run_on_ensemble_pool([functools.partial(scorer, claim, prepared) for scorer in scorers])
+
+def _run_on_ensemble_pool(calls: Sequence[Callable[[], Any]]) -> list:
+    """Results of calls run concurrently on the ensemble pool, in order (the first error in order is raised);
+    TimeoutError if they have not all finished within ENSEMBLE_TIMEOUT seconds."""
+    # copy_context(): the pool threads score with the release this request pinned (and its profile sample)
+    futures = [_get_ensemble_pool().submit(copy_context().run, profiled_call, call) for call in calls]
+    deadline = time.monotonic() + ENSEMBLE_TIMEOUT
+    try:
+        return [future.result(timeout=max(deadline - time.monotonic(), 0.0)) for future in futures]
+    except TimeoutError:
+        raise TimeoutError(f"Ensemble scoring did not finish within {ENSEMBLE_TIMEOUT:g}s") from None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+# --- BATCH SCORING (vectorized counterpart of fraudriskscore_ensemble) ---
+
+def _extract_texts(df: pd.DataFrame) -> list:
+    """Row-wise _extract_text over a claims frame."""
+    texts = np.full(len(df), "", dtype=object)
+    pending = np.ones(len(df), dtype=bool)
+    for key in TEXT_KEYS:
+        if key not in df.columns:
+            continue
+        values = df[key].to_numpy(dtype=object)
+        usable = np.fromiter((v not in (None, "") for v in values), dtype=bool, count=len(values))
+        take = pending & usable
+        texts[take] = values[take]
+        pending &= ~take
+    return list(texts)
+
+def _round4(values: np.ndarray) -> np.ndarray:
+    # Python's round() (not np.round) so batch scores match the single-claim path exactly.
+    return np.array([round(float(v), 4) for v in values], dtype=float)
+
+def _risk_tiers(proba: np.ndarray, threshold: float, high_risk_limit: float) -> np.ndarray:
+    """Vectorized _apply_threshold_logic; returns tier codes 0 (Low), 1 (Medium), 2 (High)."""
+    return np.where(proba < threshold, 0, np.where(proba < high_risk_limit, 1, 2))
+
+_RISK_LEVELS = np.array(["Low", "Medium", "High"], dtype=object)
+_DECISIONS = np.array(["Approve Automatically.", "Manual Review Required.", "Flagged as Potential Fraud."], dtype=object)
+
+def _predict_ensemble(frame: pd.DataFrame, names: Sequence[str] = ENSEMBLE_ORDER) -> np.ndarray:
+    """(rows, models) probabilities, one predict_proba call per ensemble member.
+
+    Small frames (up to ENSEMBLE_CONCURRENT_ROWS rows: single claims, micro-batches) have the members
+    evaluated concurrently on the ensemble pool, like _score_models.
+    """
+    calls = [functools.partial(_predict_model, frame, name) for name in names]
+    if ENSEMBLE_WORKERS > 1 and len(calls) > 1 and len(frame) <= ENSEMBLE_CONCURRENT_ROWS:
+        return np.column_stack(_run_on_ensemble_pool(calls))
+    return np.column_stack([call() for call in calls])
+
+def _predict_model(frame: pd.DataFrame, name: str) -> np.ndarray:
+    return _predict_proba(registry.get(ENSEMBLE_ARTIFACTS[name]), frame, name)
+
+def _score_frame_isolating(frame: pd.DataFrame, names: Sequence[str] = ENSEMBLE_ORDER) -> tuple[np.ndarray, list]:
+    """Fallback for a chunk that failed as a whole: bisects it to isolate the failing rows."""
+    try:
+        return _predict_ensemble(frame, names), [None] * len(frame)
+    except Exception as e:
+        if len(frame) == 1:
+            return np.full((1, len(names)), np.nan), [str(e)]
+    mid = len(frame) // 2
+    left_probas, left_errors = _score_frame_isolating(frame.iloc[:mid], names)
+    right_probas, right_errors = _score_frame_isolating(frame.iloc[mid:], names)
+    return np.vstack([left_probas, right_probas]), left_errors + right_errors
+
+def _max_score_selection(probas: np.ndarray, failed: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rounded scores, index of the max-score model, its tier code) per row; NaN (skipped) models never win."""
+    rounded = np.column_stack([_round4(probas[:, j]) for j in range(len(ENSEMBLE_ORDER))])
+    thresholds = releases.active().thresholds
+    tiers = np.column_stack([_risk_tiers(probas[:, j], *thresholds[name])
+                             for j, name in enumerate(ENSEMBLE_ORDER)])
+    best = np.argmax(np.where(failed[:, None] | np.isnan(rounded), -1.0, rounded), axis=1)
+    rows = np.arange(len(probas))
+    return rounded, best, tiers[rows, best]
+
+def _score_frame_cascade(frame: pd.DataFrame) -> tuple[np.ndarray, list]:
+    """Like _score_frame_isolating, but each model in CASCADE_ORDER only scores the rows not yet settled.
+
+    Skipped models are NaN in the returned probabilities.
+    """
+    probas = np.full((len(frame), len(ENSEMBLE_ORDER)), np.nan)
+    errors: list = [None] * len(frame)
+    pending = np.ones(len(frame), dtype=bool)
+    for i, name in enumerate(CASCADE_ORDER):
+        rows = np.flatnonzero(pending)
+        if not len(rows):
+            break
+        model_probas, model_errors = _score_frame_isolating(frame.iloc[rows], (name,))
+        probas[rows, ENSEMBLE_ORDER.index(name)] = model_probas[:, 0]
+        for row, error in zip(rows, model_errors):
+            if error is not None:
+                errors[row] = error
+                pending[row] = False
+
+        remaining = CASCADE_ORDER[i + 1:]
+        if remaining:
+            rows = np.flatnonzero(pending)
+            rounded, best, tier = _max_score_selection(probas[rows], np.zeros(len(rows), dtype=bool))
+            pending[rows[_cascade_settled(rounded[np.arange(len(rows)), best], tier == 2, remaining)]] = False
+    return probas, errors
+
+_SCORE_COLUMNS = ["fraud_risk_score", "text_suspicion_score", "risk_level", "decision",
+                  "score_RFC", "score_LR", "score_GBC", "error"]
+_FLOAT_SCORE_COLUMNS = ["fraud_risk_score", "text_suspicion_score", "score_RFC", "score_LR", "score_GBC"]
+# risk_level/decision are kept as category codes: a tier code indexes both; failed rows get ERROR / no decision.
+RISK_LEVEL_CATEGORIES = pd.Index([*_RISK_LEVELS, "ERROR"])
+DECISION_CATEGORIES = pd.Index(_DECISIONS)
+_ERROR_TIER = 3
+
+def _allocate_scores(n: int) -> Dict[str, np.ndarray]:
+    """Preallocated score_batch columns (float64 scores, int8 category codes) for n rows."""
+    out: Dict[str, np.ndarray] = {name: np.full(n, np.nan) for name in _FLOAT_SCORE_COLUMNS}
+    out["risk_level"] = np.full(n, _ERROR_TIER, dtype=np.int8)
+    out["decision"] = np.full(n, -1, dtype=np.int8)
+    out["error"] = np.full(n, None, dtype=object)
+    return out
+
+def _store_scores(out: Dict[str, np.ndarray], rows: Any, part: Dict[str, np.ndarray]) -> None:
+    """Writes a chunk's score arrays into out at rows (a slice or positions)."""
+    for name, values in part.items():
+        out[name][rows] = values
+
+def _store_results(out: Dict[str, np.ndarray], rows: np.ndarray, results: List[Dict[str, Any]]) -> None:
+    """Writes cached result dicts into out at positions rows."""
+    out["fraud_risk_score"][rows] = [r["fraud_risk_score"] for r in results]
+    out["text_suspicion_score"][rows] = [r["text_suspicion_score"] for r in results]
+    for name in ENSEMBLE_ORDER:
+        out[f"score_{name}"][rows] = [r["model_scores"][name] for r in results]
+    out["risk_level"][rows] = RISK_LEVEL_CATEGORIES.get_indexer([r["risk_level"] for r in results])
+    out["decision"][rows] = DECISION_CATEGORIES.get_indexer([r["decision"] for r in results])
+
+def _scores_frame(out: Dict[str, np.ndarray], index: pd.Index) -> pd.DataFrame:
+    """score_batch frame over the arrays (not copied); risk_level and decision are categoricals."""
+    columns = {name: out[name] for name in _FLOAT_SCORE_COLUMNS}
+    columns["risk_level"] = pd.Categorical.from_codes(out["risk_level"], categories=RISK_LEVEL_CATEGORIES)
+    columns["decision"] = pd.Categorical.from_codes(out["decision"], categories=DECISION_CATEGORIES)
+    columns["error"] = out["error"]
+    return pd.DataFrame({name: columns[name] for name in _SCORE_COLUMNS}, index=index, copy=False)
+
+def _score_chunk(chunk: pd.DataFrame, text_scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Ensemble score arrays for one chunk of engineered claims whose text scores are known."""
+
+    # 2. One aligned feature frame for the whole chunk
+    frame = _aligned_frame(chunk)
+    if "text_suspicion_score" in frame.columns:
+        frame["text_suspicion_score"] = text_scores
+
+    # 3. One predict_proba call per model (cascade: only on the rows each model can still change)
+    probas, errors = _score_frame_cascade(frame) if ENSEMBLE_CASCADE else _score_frame_isolating(frame)
+
+    # 4. Max-score selection (same tie-breaking as fraudriskscore_ensemble)
+    failed = np.array([e is not None for e in errors], dtype=bool)
+    rounded, best, tier = _max_score_selection(probas, failed)
+    rows = np.arange(len(frame))
+
+    return {
+        "fraud_risk_score": np.where(failed, np.nan, rounded[rows, best]),
+        "text_suspicion_score": np.where(failed, np.nan, _round4(text_scores)),
+        "risk_level": np.where(failed, _ERROR_TIER, tier).astype(np.int8),
+        "decision": np.where(failed, -1, tier).astype(np.int8),
+        **{f"score_{name}": rounded[:, j] for j, name in enumerate(ENSEMBLE_ORDER)},
+        "error": np.array(errors, dtype=object),
+    }
+
+def _init_batch_worker(release: Optional[Release] = None) -> None:
+    # With fork the parent's release and models are already here (shared copy-on-write); otherwise load
+    # the live release's models once. A forked copy of the parent's ensemble pool has no threads: start afresh.
+    global _ensemble_pool, _ensemble_pool_lock
+    _ensemble_pool, _ensemble_pool_lock = None, threading.Lock()
+    if release is not None:
+        releases.pin(release)
+    registry.warm(set(ENSEMBLE_ARTIFACTS.values()))
+
+def _score_batch_parallel(df: pd.DataFrame, chunk_size: int, workers: int) -> Dict[str, np.ndarray]:
+    """score_batch across a process pool; results come back in the original row order."""
+    # 1. Text Suspicion Scores stay in this process: the embedder is already batched and multi-threaded.
+    text_scores = text_suspicion_scores(_extract_texts(df))
+
+    # Load the tabular models before forking so every worker shares the parent's copy.
+    registry.warm(set(ENSEMBLE_ARTIFACTS.values()))
+    size = max(1, min(int(chunk_size), -(-len(df) // workers)))
+    starts = range(0, len(df), size)
+    context = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+    out = _allocate_scores(len(df))
+    initargs = (releases.active(),) if context is not None else ()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_batch_worker,
+                             initargs=initargs) as pool:
+        parts = pool.map(_score_chunk, [df.iloc[s:s + size] for s in starts], [text_scores[s:s + size] for s in starts])
+        for start, part in zip(starts, parts):
+            _store_scores(out, slice(start, start + size), part)
+    return out
+
+def _score_rows(df: pd.DataFrame, chunk_size: int, workers: int) -> Dict[str, np.ndarray]:
+    """Score arrays for engineered claims, scored in-process (chunked) or across the process pool."""
+    if workers > 1 and len(df) >= PARALLEL_MIN_ROWS:
+        return _score_batch_parallel(df, chunk_size, workers)
+
+    out = _allocate_scores(len(df))
+    size = max(int(chunk_size), 1)
+    for start in range(0, len(df), size):
+        chunk = df.iloc[start:start + size]
+
+        # 1. Text Suspicion Score (distinct descriptions only)
+        text_scores = text_suspicion_scores(_extract_texts(chunk))
+        _store_scores(out, slice(start, start + size), _score_chunk(chunk, text_scores))
+    return out
+
+def _result_from_row(row: Any, model_version: str) -> Dict[str, Any]:
+    """score_batch row -> fraudriskscore_ensemble-shaped result dict."""
+    if row.risk_level == "ERROR":
+        return {"fraud_risk_score": None, "text_suspicion_score": None,
+                "risk_level": "ERROR", "decision": "Process Failed", "error": row.error,
+                "model_version": model_version}
+    scores = {name: float(getattr(row, f"score_{name}")) for name in ENSEMBLE_ORDER}
+    result = {
+        "fraud_risk_score": float(row.fraud_risk_score),
+        "text_suspicion_score": float(row.text_suspicion_score),
+        "risk_level": row.risk_level,
+        "decision": row.decision,
+        "model_scores": {name: score for name, score in scores.items() if not np.isnan(score)},
+        "model_version": model_version,
+    }
+    if len(result["model_scores"]) < len(scores):
+        result["skipped_models"] = [name for name in ENSEMBLE_ORDER if name not in result["model_scores"]]
+    return result
+
+def score_batch(df: pd.DataFrame, chunk_size: int = BATCH_CHUNK_SIZE, engineer: bool = True,
+                workers: Optional[int] = None, use_cache: bool = True) -> pd.DataFrame:
+    """Scores every claim (row) of df with the max-score ensemble.
+
+    Returns a frame aligned to df.index with the same per-row values that
+    fraudriskscore_ensemble gives: fraud_risk_score, text_suspicion_score,
+    risk_level, decision and the individual score_RFC/score_LR/score_GBC.
+    risk_level and decision are categoricals (RISK_LEVEL_CATEGORIES,
+    DECISION_CATEGORIES); rows that could not be scored have risk_level
+    "ERROR", no decision and the message in the error column. With
+    ENSEMBLE_CASCADE the score_* of skipped models are NaN. Pass
+    engineer=False if df already went through engineer_features. Inputs of
+    at least PARALLEL_MIN_ROWS rows are split across `workers` processes
+    (default BATCH_WORKERS); smaller ones are scored in-process. Rows already
+    in result_cache are not rescored. All rows are scored with one model
+    release, whose version is in scores.attrs["model_version"].
+    """
+    with releases.pinned() as release:
+        scores = _score_batch(df, chunk_size, engineer, workers, use_cache)
+    scores.attrs["model_version"] = release.version
+    return scores
+
+def _score_batch(df: pd.DataFrame, chunk_size: int, engineer: bool, workers: Optional[int],
+                 use_cache: bool) -> pd.DataFrame:
+    count("fraud_claims_scored_total", len(df), help="Claims scored")
+    if engineer:
+        df = engineer_features(df)
+
+    workers = BATCH_WORKERS if workers is None else max(int(workers), 1)
+    keys = _frame_result_keys(df) if use_cache and len(df) else None
+    if keys is None:
+        return _scores_frame(_score_rows(df, chunk_size, workers), df.index)
+
+    cached = result_cache.get_many(keys)
+    miss = np.array([c is None for c in cached], dtype=bool)
+    if miss.all():
+        out = _score_rows(df, chunk_size, workers)
+    else:
+        # Cached and freshly scored rows are written into one set of arrays, by position.
+        out = _allocate_scores(len(df))
+        _store_results(out, np.flatnonzero(~miss), [c for c in cached if c is not None])
+        if miss.any():
+            _store_scores(out, np.flatnonzero(miss), _score_rows(df[miss], chunk_size, workers))
+    scores = _scores_frame(out, df.index)
+
+    if miss.any():
+        scored = scores[miss]
+        version = releases.active().version
+        results = ((key, _result_from_row(row, version))
+                   for key, row in zip(np.asarray(keys, dtype=object)[miss], scored.itertuples(index=False))
+                   if row.risk_level != "ERROR")
+        # Cascade results with skipped models are not cached: the cache holds complete results only.
+        result_cache.put_many((key, result) for key, result in results if "skipped_models" not in result)
+    return scores
+
+def score_claims(claims: List[Dict[str, Any]], engineer: bool = True) -> List[Dict[str, Any]]:
+    """Scores a list of claim dicts in one batch; one result dict per claim, in order.
+
+    Each result has the same keys and values as fraudriskscore_ensemble; claims
+    that could not be scored get risk_level "ERROR" and an "error" message.
+    With engineer=True the ratio/flag/daysdiff features are (re)computed first.
+    """
+    if not claims:
+        return []
+    # object dtype keeps each value's own type, exactly like a one-row frame per claim
+    df = pd.DataFrame(claims, dtype=object)
+    with profiled("score_claims"), stage("score_claims"):
+        scores = score_batch(df, engineer=engineer)
 
+    version = scores.attrs["model_version"]
+    return [_result_from_row(row, version) for row in scores.itertuples(index=False)]
@@ -0,0 +1,294 @@
+"""Stage timers, counters and sampled profiling for the scoring pipeline.
+
+Disabled by default: stage() then hands back one shared no-op context
+manager, so the instrumented code pays a function call and a flag check.
+Enable with FRAUD_INSTRUMENTATION=1 (or enable()) and read the numbers with
+render_prometheus(), or set FRAUD_METRICS_FILE to have them written there
+at exit. FRAUD_PROFILE_SAMPLE_RATE (0..1) additionally profiles that
+fraction of profiled() calls and writes one file per sample to
+FRAUD_PROFILE_DIR (cProfile .prof, or pyinstrument .html when
+FRAUD_PROFILER=pyinstrument and it is installed). Work a sampled call hands
+to a thread pool through profiled_call() in a copy_context() is profiled too:
+merged into the sample's .prof, or one <name>-worker .html per call.
+"""
+import atexit, contextlib, os, random, tempfile, threading, time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# --- Settings (environment overrides) ---
+ENABLED = os.environ.get("FRAUD_INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("FRAUD_METRICS_FILE", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("FRAUD_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("FRAUD_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "fraud_profiles"))
+PROFILER = os.environ.get("FRAUD_PROFILER", "cprofile").lower()
+
+# Seconds; spans a cached text score (sub-ms) up to a large batch.
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# --- Metric types ---
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style: bucket "le" labels, "+Inf" last)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = {}, 0
+        for le, n in zip(self.buckets + [float("inf")], counts):
+            running += n
+            cumulative["+Inf" if le == float("inf") else f"{le:g}"] = running
+        return {"buckets": cumulative, "sum": total, "count": running}
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value read from a callback at export time (e.g. a queue length)."""
+
+    def __init__(self, fn):
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        return float(self._fn())
+
+
+# --- Registry: (metric name, sorted label pairs) -> metric ---
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_metrics: Dict[Tuple[str, Labels], Any] = {}
+_help: Dict[str, str] = {}
+_metrics_lock = threading.Lock()
+
+
+def _key(name: str, labels: Optional[Dict[str, str]]) -> Tuple[str, Labels]:
+    return name, tuple(sorted((labels or {}).items()))
+
+def register(name: str, metric: Any, help: str = "", labels: Optional[Dict[str, str]] = None) -> Any:
+    """Exports an existing metric object under name/labels (replacing any previous one)."""
+    with _metrics_lock:
+        _metrics[_key(name, labels)] = metric
+        if help:
+            _help[name] = help
+    return metric
+
+def _get_or_create(name: str, labels: Optional[Dict[str, str]], factory, help: str) -> Any:
+    key = _key(name, labels)
+    metric = _metrics.get(key)
+    if metric is None:
+        with _metrics_lock:
+            metric = _metrics.get(key)
+            if metric is None:
+                metric = _metrics[key] = factory()
+                _help.setdefault(name, help)
+    return metric
+
+def histogram(name: str, labels: Optional[Dict[str, str]] = None, buckets: Sequence[float] = STAGE_BUCKETS,
+              help: str = "") -> Histogram:
+    return _get_or_create(name, labels, lambda: Histogram(buckets), help)
+
+def counter(name: str, labels: Optional[Dict[str, str]] = None, help: str = "") -> Counter:
+    return _get_or_create(name, labels, Counter, help)
+
+def reset() -> None:
+    """Drops every stage/counter metric (metrics registered with register() are dropped too)."""
+    with _metrics_lock:
+        _metrics.clear()
+        _help.clear()
+
+
+# --- Stage timing ---
+
+_NULL = contextlib.nullcontext()
+
+def enable(flag: bool = True) -> None:
+    global ENABLED
+    ENABLED = bool(flag)
+
+@contextlib.contextmanager
+def _timed_stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        counter("fraud_stage_errors_total", {"stage": name}, "Stages that raised").inc()
+        raise
+    finally:
+        histogram("fraud_stage_seconds", {"stage": name},
+                  help="Wall time per scoring stage").observe(time.perf_counter() - start)
+
+def stage(name: str):
+    """Context manager timing one pipeline stage into fraud_stage_seconds{stage=name}."""
+    if not ENABLED:
+        return _NULL
+    return _timed_stage(name)
+
+def count(name: str, amount: float = 1.0, labels: Optional[Dict[str, str]] = None, help: str = "") -> None:
+    """Increments a counter (no-op while disabled)."""
+    if ENABLED:
+        counter(name, labels, help).inc(amount)
+
+
+# --- Sampled profiling ---
+
+def _profile_path(name: str, ext: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{name}-{stamp}-{os.getpid()}-{random.randrange(1 << 16):04x}.{ext}")
+
+def _pyinstrument():
+    try:
+        from pyinstrument import Profiler
+        return Profiler
+    except ImportError:
+        return None
+
+class _Sample:
+    """A profiled() call being sampled: its name, thread and the finished cProfile runs of its pool work."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.thread = threading.get_ident()
+        self.worker_profiles: List[Any] = []
+
+# The sample in progress, seen by pool threads that run in a copy_context() of the sampled call.
+_sample: ContextVar[Optional[_Sample]] = ContextVar("profile_sample", default=None)
+
+@contextlib.contextmanager
+def profiled(name: str) -> Iterator[None]:
+    """Profiles the block for a PROFILE_SAMPLE_RATE fraction of calls, with its profiled_call() pool work."""
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        yield
+        return
+
+    sample = _Sample(name)
+    token = _sample.set(sample)
+    Profiler = _pyinstrument() if PROFILER == "pyinstrument" else None
+    try:
+        if Profiler is not None:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(_profile_path(name, "html"), "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+        else:
+            import cProfile, pstats
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                stats = pstats.Stats(profiler)
+                # Pool work still running (e.g. after a timeout) has not been appended and is left out.
+                for worker in list(sample.worker_profiles):
+                    stats.add(worker)
+                stats.dump_stats(_profile_path(name, "prof"))
+    finally:
+        _sample.reset(token)
+    counter("fraud_profiles_total", {"name": name}, "Profiles written").inc()
+
+def profiled_call(fn: Callable[..., Any], *args: Any) -> Any:
+    """fn(*args) on a pool thread, profiled when the call that submitted it (in a copy_context()) is sampled."""
+    sample = _sample.get()
+    if sample is None or sample.thread == threading.get_ident():
+        return fn(*args)
+    Profiler = _pyinstrument() if PROFILER == "pyinstrument" else None
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return fn(*args)
+        finally:
+            profiler.stop()
+            with open(_profile_path(f"{sample.name}-worker", "html"), "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+    import cProfile
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(fn, *args)
+    finally:
+        sample.worker_profiles.append(profile)
+
+
+# --- Export ---
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text exposition format (version 0.0.4)."""
+    with _metrics_lock:
+        items = sorted(_metrics.items(), key=lambda kv: kv[0])
+        helps = dict(_help)
+
+    lines: List[str] = []
+    seen = set()
+    for (name, labels), metric in items:
+        if name not in seen:
+            seen.add(name)
+            kind = ("histogram" if isinstance(metric, Histogram)
+                    else "counter" if isinstance(metric, Counter) else "gauge")
+            if name in helps:
+                lines.append(f"# HELP {name} {helps[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+        if isinstance(metric, Histogram):
+            snap = metric.snapshot()
+            for le, n in snap["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {n}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snap['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {snap['count']}")
+        else:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+def dump(path: str = METRICS_FILE) -> None:
+    """Writes render_prometheus() to path (atomically, so a scraper never reads half a file)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+if METRICS_FILE:
+    atexit.register(dump, METRICS_FILE)
@@ -0,0 +1,150 @@
+import asyncio, os, threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fraudriskscore_final import score_claims
+from instrumentation import Gauge, Histogram, register
+
+# --- Scheduler settings (environment overrides) ---
+MAX_WAIT_MS = float(os.environ.get("FRAUD_MICROBATCH_MAX_WAIT_MS", "5"))
+MAX_BATCH_SIZE = int(os.environ.get("FRAUD_MICROBATCH_MAX_BATCH_SIZE", "64"))
+
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatchScheduler:
+    """Queues single-claim requests and scores them in batches.
+
+    A batch is dispatched once max_batch_size claims are waiting or
+    max_wait_ms has passed since its first claim, whichever comes first; it
+    is scored with one call to score_fn (one batched embedding and one
+    predict_proba per model), and every caller's future gets its own result.
+    If that call raises, each claim is rescored on its own, so a malformed
+    claim fails only its own request.
+    The queue runs on its own event loop thread, so both asyncio handlers
+    (await submit) and blocking callers such as Streamlit (score) can use it.
+    """
+
+    def __init__(self, score_fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]] = score_claims,
+                 max_wait_ms: float = MAX_WAIT_MS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.score_fn = score_fn
+        self.max_wait_ms = float(max_wait_ms)
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.queue_depth = Histogram(_SIZE_BUCKETS)
+        self.batch_size = Histogram(_SIZE_BUCKETS)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._start_lock = threading.Lock()
+
+    # --- lifecycle ---
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+
+            def run() -> None:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._queue = asyncio.Queue()
+                self._loop = loop
+                loop.create_task(self._run())
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run, name="microbatch", daemon=True).start()
+            ready.wait()
+
+    # --- submission ---
+
+    def submit_future(self, claim: Dict[str, Any]) -> Future:
+        """Queues one claim from any thread; returns a concurrent.futures.Future of its result."""
+        self.start()
+        future: Future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (claim, future))
+        return future
+
+    async def submit(self, claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable variant of submit_future for asyncio callers."""
+        return await asyncio.wrap_future(self.submit_future(claim))
+
+    def score(self, claim: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking variant of submit_future."""
+        return self.submit_future(claim).result(timeout)
+
+    # --- batching loop ---
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Dict[str, Any], Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.queue_depth.observe(len(batch) + self._queue.qsize())
+            self.batch_size.observe(len(batch))
+
+            claims = [claim for claim, _ in batch]
+            outcomes = await loop.run_in_executor(None, self._score_isolating, claims)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _score_isolating(self, claims: List[Dict[str, Any]]) -> List[Tuple[Any, Optional[BaseException]]]:
+        """(result, None) or (None, error) per claim: one score_fn call, or one per claim if that call fails."""
+        try:
+            return [(result, None) for result in self.score_fn(claims)]
+        except Exception as e:
+            if len(claims) == 1:
+                return [(None, e)]
+        outcomes: List[Tuple[Any, Optional[BaseException]]] = []
+        for claim in claims:
+            try:
+                outcomes.append((self.score_fn([claim])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+    # --- metrics ---
+
+    def export_metrics(self, prefix: str = "fraud_microbatch") -> None:
+        """Publishes this scheduler's histograms through instrumentation.render_prometheus."""
+        register(f"{prefix}_queue_depth", self.queue_depth, "Claims waiting when a batch was dispatched")
+        register(f"{prefix}_batch_size", self.batch_size, "Claims per dispatched batch")
+        register(f"{prefix}_queue_depth_now", Gauge(lambda: self._queue.qsize() if self._queue is not None else 0),
+                 "Claims currently waiting")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth_now": self._queue.qsize() if self._queue is not None else 0,
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+            "max_wait_ms": self.max_wait_ms,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+_default: Optional[MicroBatchScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> MicroBatchScheduler:
+    """Process-wide scheduler shared by the API and the Streamlit pages."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = MicroBatchScheduler()
+            _default.start()
+            _default.export_metrics()
+        return _default
@@ -0,0 +1,251 @@
+import importlib, mmap, os, pickle, sys, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+
+# Directory holding the .joblib artifacts (defaults to the app directory).
+MODEL_DIR = os.environ.get("FRAUD_MODEL_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+# FRAUD_MODEL_MMAP=1 memory-maps the arrays of uncompressed artifacts read-only, so worker processes on one
+# host share one page-cache copy. Opt-in: overwriting a mapped file in place crashes its readers (SIGBUS);
+# with it on, artifacts may only be replaced by a new file (model_releases publish, or os.replace).
+MMAP_MODE: Optional[str] = "r" if os.environ.get("FRAUD_MODEL_MMAP", "0").lower() in ("1", "true", "yes") else None
+
+# After a failed load, get() re-raises that failure for this many seconds before trying the file again.
+LOAD_RETRY_SECONDS = float(os.environ.get("FRAUD_MODEL_LOAD_RETRY_SECONDS", "30"))
+
+# Modules the pickled pipelines are built from, imported once before any of them is unpickled: threads that
+# import sklearn concurrently can get an ImportError from a partially initialized module.
+MODEL_MODULES = ("sklearn.ensemble", "sklearn.linear_model", "sklearn.compose", "sklearn.preprocessing",
+                 "sklearn.pipeline")
+_model_modules_lock = threading.Lock()
+_model_modules_imported = False
+
+
+def import_model_modules() -> None:
+    """Imports MODEL_MODULES (once per process; missing ones are left to fail in the load that needs them)."""
+    global _model_modules_imported
+    if _model_modules_imported:
+        return
+    with _model_modules_lock:
+        if not _model_modules_imported:
+            for module in MODEL_MODULES:
+                try:
+                    importlib.import_module(module)
+                except ImportError:
+                    pass
+            _model_modules_imported = True
+
+
+class ArtifactLoadError(RuntimeError):
+    """A model artifact could not be loaded (missing, unreadable or broken file)."""
+
+
+def file_signature(path: str) -> tuple:
+    """(path, mtime_ns, size), or Nones when the file does not exist."""
+    try:
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size
+    except OSError:
+        return path, None, None
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    """Whether the array's memory is a file mapping (np.memmap / mmap), shared with other processes."""
+    base: Any = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def _deep_nbytes(obj: Any, seen: Optional[set] = None, mapped: Optional[List[int]] = None) -> int:
+    """Approximate in-memory size of a loaded artifact (numpy buffers, torch tensors, python containers).
+
+    Bytes of memory-mapped arrays are included and also added to mapped[0] when given.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if mapped is not None and _is_mapped(obj):
+            mapped[0] += size
+        if obj.dtype == object:
+            size += sum(_deep_nbytes(v, seen, mapped) for v in obj.ravel())
+        return size
+    # torch may be half-imported by another thread's load: only a fully imported torch has nn.Module.
+    torch_module = getattr(getattr(sys.modules.get("torch"), "nn", None), "Module", None)
+    if torch_module is not None and isinstance(obj, torch_module):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_deep_nbytes(k, seen, mapped) + _deep_nbytes(v, seen, mapped)
+                                        for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_deep_nbytes(v, seen, mapped) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + _deep_nbytes(vars(obj), seen, mapped)
+    # Extension types (e.g. sklearn's Cython Tree) only expose their buffers through pickling.
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(obj)
+
+
+# Magic prefixes of the compressors joblib.dump(compress=...) can use.
+_COMPRESSED_PREFIXES = (b"\x1f\x8b", b"BZ", b"\xfd7zXZ", b"\x5d\x00\x00", b"\x04\x22\x4d\x18", b"ZF")
+
+
+def _is_compressed_joblib(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(6).startswith(_COMPRESSED_PREFIXES)
+    except OSError:
+        return False
+
+
+class _Artifact:
+    def __init__(self, name: str, loader: Callable[[], Any], path: Optional[str]):
+        self.name = name
+        self.loader = loader
+        self.path = path
+        self.lock = threading.Lock()
+        self.value: Any = None
+        self.loaded = False
+        self.error: Optional[BaseException] = None
+        self.failed_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.nbytes: Optional[int] = None
+        self.mapped_bytes: Optional[int] = None
+
+
+class ModelRegistry:
+    """Loads model artifacts lazily on first use and keeps them for the process lifetime.
+
+    Each artifact is loaded at most once (concurrent callers wait on the same
+    load). warm() loads everything in parallel; warm_in_background() does the
+    same without blocking, e.g. when a server starts.
+    """
+
+    def __init__(self, base_dir: str = MODEL_DIR):
+        self.base_dir = base_dir
+        self._artifacts: Dict[str, _Artifact] = {}
+        self._warm_future: Optional[Future] = None
+        self._warm_lock = threading.Lock()
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.base_dir, filename)
+
+    def register(self, name: str, loader: Callable[[], Any], path: Optional[str] = None) -> None:
+        self._artifacts[name] = _Artifact(name, loader, path)
+
+    def register_joblib(self, name: str, filename: str, mmap_mode: Optional[str] = MMAP_MODE) -> None:
+        """Registers a joblib artifact; its numpy arrays are memory-mapped when the file is uncompressed."""
+        path = self.path(filename)
+
+        def load() -> Any:
+            import joblib  # deferred until the first load (keeps module import fast)
+            import_model_modules()
+            if mmap_mode is not None and _is_compressed_joblib(path):
+                return joblib.load(path)  # compressed pickles cannot be mapped
+            return joblib.load(path, mmap_mode=mmap_mode)
+
+        self.register(name, load, path)
+
+    def names(self) -> List[str]:
+        return list(self._artifacts)
+
+    def get(self, name: str) -> Any:
+        """The loaded artifact; ArtifactLoadError when it cannot be loaded."""
+        art = self._artifacts[name]
+        if art.loaded:
+            return art.value
+        with art.lock:
+            if not art.loaded:
+                if art.error is not None and time.monotonic() - art.failed_at < LOAD_RETRY_SECONDS:
+                    raise ArtifactLoadError(f"{name} could not be loaded: {type(art.error).__name__}: {art.error}")
+                start = time.perf_counter()
+                try:
+                    value = art.loader()
+                except Exception as e:
+                    # Remembered for LOAD_RETRY_SECONDS, then retried (e.g. once the file has been deployed).
+                    art.error, art.failed_at = e, time.monotonic()
+                    raise ArtifactLoadError(f"{name} could not be loaded: {type(e).__name__}: {e}") from e
+                art.load_seconds = time.perf_counter() - start
+                mapped = [0]
+                art.nbytes = _deep_nbytes(value, mapped=mapped)
+                art.mapped_bytes = mapped[0]
+                art.value, art.error = value, None
+                art.loaded = True
+        return art.value
+
+    def file_paths(self) -> Dict[str, str]:
+        """{name: path} of the file-backed artifacts."""
+        return {a.name: a.path for a in self._artifacts.values() if a.path}
+
+    def file_signatures(self) -> List[tuple]:
+        """file_signature() of every file-backed artifact; changes whenever one is replaced."""
+        return [file_signature(path) for path in self.file_paths().values()]
+
+    def is_loaded(self, name: str) -> bool:
+        return self._artifacts[name].loaded
+
+    def is_warm(self) -> bool:
+        return all(a.loaded for a in self._artifacts.values())
+
+    def warm(self, names: Optional[Iterable[str]] = None, max_workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+        """Loads the given (default: all) artifacts in parallel; returns {name: error message or None}."""
+        names = list(names) if names is not None else self.names()
+
+        def load(name: str) -> Optional[str]:
+            try:
+                self.get(name)
+                return None
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+
+        if not names:
+            return {}
+        import_model_modules()
+        with ThreadPoolExecutor(max_workers=max_workers or len(names), thread_name_prefix="model-warm") as pool:
+            return dict(zip(names, pool.map(load, names)))
+
+    def warm_in_background(self, names: Optional[Iterable[str]] = None) -> Future:
+        """Starts warm() on a daemon thread (once per registry) and returns its future."""
+        with self._warm_lock:
+            if self._warm_future is None:
+                future: Future = Future()
+
+                def run() -> None:
+                    try:
+                        future.set_result(self.warm(names))
+                    except BaseException as e:
+                        future.set_exception(e)
+
+                threading.Thread(target=run, name="model-warm", daemon=True).start()
+                self._warm_future = future
+            return self._warm_future
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-artifact status: loaded, load time (s), approximate memory and memory-mapped bytes, file size, last error."""
+        rows = []
+        for art in self._artifacts.values():
+            file_bytes = os.path.getsize(art.path) if art.path and os.path.exists(art.path) else None
+            rows.append({
+                "artifact": art.name,
+                "path": art.path,
+                "loaded": art.loaded,
+                "load_seconds": None if art.load_seconds is None else round(art.load_seconds, 3),
+                "memory_bytes": art.nbytes,
+                "mapped_bytes": art.mapped_bytes,
+                "file_bytes": file_bytes,
+                "error": None if art.error is None else f"{type(art.error).__name__}: {art.error}",
+            })
+        return rows
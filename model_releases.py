@@ -0,0 +1,332 @@
+"""Versioned model releases, hot-swapped without restarting the workers.
+
+    python model_releases.py publish ./retrained --version 2026-10-17   # copy in and activate
+    python model_releases.py activate 2026-10-01                        # roll back / forward
+    python model_releases.py list
+
+compiled_models.py export and text_distill.py train add their artifacts to a
+staged copy of the live release (copy_release()), published from there.
+
+Layout under the model directory (FRAUD_MODEL_DIR):
+
+    releases/
+        2026-10-17/         one directory per release, never modified once published
+            manifest.json
+            fraud_detection_model.joblib ...
+        CURRENT             name of the live release directory
+
+manifest.json names the release and carries everything that used to be
+hard-coded or read once at import:
+
+    {"version": "2026-10-17",
+     "files": {"final_model": "fraud_detection_model.joblib"},        (optional, per artifact)
+     "thresholds": {"RFC": [0.2, 0.5], "LR": [0.5, 0.7], "GBC": [0.3, 0.6]},
+     "global_threshold": 0.2}
+
+Without releases/CURRENT the model directory itself is the release (with an
+optional manifest.json), as before. ReleaseManager polls CURRENT, the
+manifest and the artifact files; on a change it builds the new release,
+loads every artifact on the watcher thread and only then swaps it in. A
+request pins the release it started on (pinned()), so in-flight requests
+finish on the old models while new ones get the new release.
+"""
+import argparse, json, os, shutil, sys, tempfile, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from model_registry import MODEL_DIR, ModelRegistry, file_signature
+
+RELEASES_DIR = "releases"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+# Seconds between checks for a new release (0 = never reload; the first release is kept for the process lifetime).
+WATCH_SECONDS = float(os.environ.get("FRAUD_MODEL_WATCH_SECONDS", "10"))
+# A release that failed to load is retried after this many seconds (the failure may have been transient).
+RETRY_SECONDS = float(os.environ.get("FRAUD_MODEL_RETRY_SECONDS", "300"))
+
+
+def read_manifest(directory: str, required: bool = False) -> Dict[str, Any]:
+    """Parsed manifest.json of a release directory ({} when absent and not required)."""
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        if required:
+            raise
+        return {}
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return manifest
+
+
+class Release:
+    """One model release: its artifacts (a ModelRegistry over its directory), thresholds and version."""
+
+    def __init__(self, version: str, directory: str, registry: ModelRegistry, thresholds: Dict[str, tuple],
+                 global_threshold: float, files: Dict[str, str], watch_paths: Sequence[str] = ()):
+        self.version = version
+        self.directory = directory
+        self.registry = registry
+        self.thresholds = thresholds
+        self.global_threshold = global_threshold
+        self.files = files
+        # Files whose replacement means a new release (besides releases/CURRENT).
+        self.watch_paths = list(watch_paths)
+        self.created_at = time.time()
+        self.signature: Optional[tuple] = None
+
+
+class ActiveRegistry:
+    """ModelRegistry interface over the release in use: the one pinned by the request, else the current one."""
+
+    def __init__(self, manager: "ReleaseManager"):
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._manager.active().registry, name)
+
+
+class ReleaseManager:
+    """Keeps the live Release and replaces it atomically when a new one is published.
+
+    build(directory, manifest) registers a release's artifacts without loading
+    them; the first release is built at construction (its artifacts load
+    lazily, as before), later ones are fully loaded before they go live. A
+    release whose artifacts fail to load is rejected (retried after
+    RETRY_SECONDS) and the old one stays.
+    """
+
+    def __init__(self, build: Callable[[str, Dict[str, Any]], Release], base_dir: str = MODEL_DIR):
+        self.base_dir = base_dir
+        self._build = build
+        self._pinned: ContextVar[Optional[Release]] = ContextVar("model_release", default=None)
+        self._reload_lock = threading.Lock()
+        self._watch_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._rejected: Optional[tuple] = None
+        self._rejected_at = 0.0
+        self.reloads = 0
+        self.previous_version: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._current = self._load()
+        self.registry = ActiveRegistry(self)
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.base_dir, RELEASES_DIR, CURRENT_FILE)
+
+    def locate(self) -> tuple:
+        """(directory, manifest) of the release to serve: releases/<CURRENT>, else the model directory itself."""
+        try:
+            with open(self.pointer_path) as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            name = ""
+        if not name:
+            return self.base_dir, read_manifest(self.base_dir)
+        directory = os.path.join(self.base_dir, RELEASES_DIR, name)
+        return directory, read_manifest(directory, required=True)
+
+    def _signature(self, release: Release) -> tuple:
+        pointer = file_signature(self.pointer_path)
+        if pointer[1] is not None:
+            with open(self.pointer_path) as f:
+                pointer += (f.read().strip(),)
+        return (pointer, *(file_signature(p) for p in release.watch_paths))
+
+    def _load(self) -> Release:
+        directory, manifest = self.locate()
+        release = self._build(directory, manifest)
+        release.signature = self._signature(release)
+        return release
+
+    def current(self) -> Release:
+        """The live release (what a new request starts on)."""
+        return self._current
+
+    def active(self) -> Release:
+        """The release pinned by the running request, else the live one."""
+        return self._pinned.get() or self._current
+
+    def pin(self, release: Optional[Release] = None) -> Any:
+        """Pins release (default: the live one) for the rest of this thread/context; returns the ContextVar token."""
+        return self._pinned.set(release or self._current)
+
+    @contextmanager
+    def pinned(self) -> Iterator[Release]:
+        """Pins the live release for the duration of a request (nested requests keep the outer pin)."""
+        release = self._pinned.get()
+        if release is not None:
+            yield release
+            return
+        token = self.pin()
+        try:
+            yield self._pinned.get()
+        finally:
+            self._pinned.reset(token)
+
+    def poll(self) -> bool:
+        """Reloads when CURRENT, the manifest or an artifact file changed; True when a new release went live."""
+        state = self._signature(self._current)
+        if state == self._current.signature:
+            return False
+        if state == self._rejected and time.monotonic() - self._rejected_at < RETRY_SECONDS:
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """Builds and fully loads the release on disk, then swaps it in; False (old release kept) on failure."""
+        with self._reload_lock:
+            trigger = self._signature(self._current)
+            try:
+                candidate = self._load()
+                versioned = candidate.registry.file_paths()
+                # One artifact at a time, so the live release keeps the CPU while the new one loads.
+                errors = {name: error for name, error in candidate.registry.warm(max_workers=1).items()
+                          if error and name in versioned}
+                if errors:
+                    raise RuntimeError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._rejected, self._rejected_at = trigger, time.monotonic()
+                return False
+            self.previous_version = self._current.version
+            # A single reference swap: requests that pinned the old release keep using it.
+            self._current = candidate
+            self.reloads += 1
+            self.last_error, self._rejected = None, None
+            return True
+
+    def watch(self, interval: float = WATCH_SECONDS) -> bool:
+        """Starts polling for new releases every interval seconds on a daemon thread (once per manager)."""
+        if interval <= 0:
+            return False
+        with self._watch_lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch_loop, args=(interval,),
+                                                 name="model-watch", daemon=True)
+                self._watcher.start()
+        return True
+
+    def _watch_loop(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def status(self) -> Dict[str, Any]:
+        """Live release, reload count and the last reload error (None when the last attempt succeeded)."""
+        release = self._current
+        return {
+            "version": release.version,
+            "directory": release.directory,
+            "live_since": round(release.created_at, 3),
+            "previous_version": self.previous_version,
+            "reloads": self.reloads,
+            "watching": self._watcher is not None,
+            "last_error": self.last_error,
+        }
+
+
+# --- PUBLISHING (CLI) ---
+
+def activate(base_dir: str, name: str) -> None:
+    """Points releases/CURRENT at an existing release directory (atomic rename)."""
+    directory = os.path.join(base_dir, RELEASES_DIR, name)
+    read_manifest(directory, required=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.join(base_dir, RELEASES_DIR), prefix=".CURRENT.")
+    with os.fdopen(fd, "w") as f:
+        f.write(name + "\n")
+    os.replace(tmp, os.path.join(base_dir, RELEASES_DIR, CURRENT_FILE))
+
+
+def copy_release(release: Release, target: str, extra_files: Sequence[str] = ()) -> str:
+    """Writable copy of a release in the new directory target, to add artifacts to and then publish().
+
+    Copies the release's artifact files (and extra_files, names in its directory; missing ones are
+    skipped) and writes a manifest with its files and thresholds but no version. A directory already
+    staged is reused as is, so several tools can add to one new release; published releases are refused.
+    """
+    if os.path.abspath(target) == os.path.abspath(release.directory):
+        raise ValueError(f"{target} is the release being copied; stage into a new directory")
+    if os.path.isfile(os.path.join(target, MANIFEST_FILE)):
+        # Staged manifests carry no version; publish() writes one into every published release.
+        if "version" in read_manifest(target):
+            raise ValueError(f"{target} is a published release; stage into a new directory")
+        return target
+    if os.path.isdir(target) and os.listdir(target):
+        raise FileExistsError(f"{target} is not empty and has no {MANIFEST_FILE}")
+    os.makedirs(target, exist_ok=True)
+    for filename in dict.fromkeys([*release.files.values(), *extra_files]):
+        source = os.path.join(release.directory, filename)
+        if os.path.isfile(source):
+            os.makedirs(os.path.dirname(os.path.join(target, filename)), exist_ok=True)
+            shutil.copyfile(source, os.path.join(target, filename))  # no copystat: published files are read-only
+    manifest = {key: value for key, value in read_manifest(release.directory).items() if key != "version"}
+    manifest.update(files=dict(release.files), global_threshold=release.global_threshold,
+                    thresholds={name: list(limits) for name, limits in release.thresholds.items()})
+    with open(os.path.join(target, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return target
+
+
+def publish(base_dir: str, source: str, version: Optional[str] = None) -> str:
+    """Copies a directory of artifacts (with manifest.json) to releases/<version>; returns the version."""
+    manifest = read_manifest(source, required=True)
+    version = version or manifest.get("version")
+    if not version or os.sep in version or version.startswith("."):
+        raise ValueError(f"invalid release version {version!r}")
+    releases = os.path.join(base_dir, RELEASES_DIR)
+    target = os.path.join(releases, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"release {version!r} already exists")
+    os.makedirs(releases, exist_ok=True)
+    # Copied under a temporary name and renamed, so a watcher never sees a half-written release.
+    staging = tempfile.mkdtemp(dir=releases, prefix=f".{version}.")
+    shutil.copytree(source, staging, dirs_exist_ok=True)
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump({**manifest, "version": version}, f, indent=2)
+    # Read-only: workers may memory-map these files (FRAUD_MODEL_MMAP), and rewriting a mapped file crashes them.
+    for root, _, files in os.walk(staging):
+        for name in files:
+            os.chmod(os.path.join(root, name), 0o444)
+    os.rename(staging, target)
+    return version
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["publish", "activate", "list"])
+    parser.add_argument("target", nargs="?", help="publish: directory with the artifacts and manifest.json; "
+                                                  "activate: release name")
+    parser.add_argument("--version", help="publish: release name (default: the manifest's version)")
+    parser.add_argument("--no-activate", action="store_true", help="publish without switching CURRENT")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    releases = os.path.join(args.model_dir, RELEASES_DIR)
+    if args.command == "list":
+        try:
+            with open(os.path.join(releases, CURRENT_FILE)) as f:
+                current = f.read().strip()
+        except FileNotFoundError:
+            current = None
+        names = sorted(n for n in os.listdir(releases) if not n.startswith(".")
+                       and os.path.isdir(os.path.join(releases, n))) if os.path.isdir(releases) else []
+        print(json.dumps({"current": current, "releases": names}, indent=2))
+        return 0
+    if not args.target:
+        parser.error(f"{args.command} needs a target")
+    name = publish(args.model_dir, args.target, args.version) if args.command == "publish" else args.target
+    if args.command == "activate" or not args.no_activate:
+        activate(args.model_dir, name)
+    print(json.dumps({"release": name, "activated": args.command == "activate" or not args.no_activate}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
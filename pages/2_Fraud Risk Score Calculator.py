@@ -5,7 +5,6 @@ from typing import Dict, Any
 import sys
 import os
 import time
-import matplotlib.pyplot as plt
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -21,7 +20,23 @@ if 'logged_in' not in st.session_state or not st.session_state.logged_in:
     time.sleep(2.5)
     st.switch_page("Login.py")
 
-from fraudriskscore_final import fraudriskscore_RFC, fraudriskscore_LR, fraudriskscore_GBC,fraudriskscore_final,fraudriskscore_ensemble
+from fraudriskscore_final import fraudriskscore_RFC, fraudriskscore_LR, fraudriskscore_GBC,fraudriskscore_final, registry, releases, REQUIRED_INPUT_COLUMNS
+from batch_io import DEFAULT_KEY_COLUMNS, FORMATS, detect_format
+from batch_jobs import FAILED, QUEUED, RUNNING, get_job_queue, job_content_key
+from microbatch import get_scheduler
+
+@st.cache_resource
+def start_model_warmup():
+    """Loads every model artifact in the background and watches for new releases, once per server process."""
+    releases.watch()
+    return registry.warm_in_background()
+
+start_model_warmup()
+
+@st.cache_resource
+def get_batch_job_queue():
+    """Batch job queue and its worker threads, once per server process."""
+    return get_job_queue()
 
 st.set_page_config(page_title="Fraud Risk Score Calculator",layout="centered",initial_sidebar_state="expanded")
 
@@ -35,27 +50,21 @@ st.sidebar.button("Logout", on_click=logout, key="sidebar_logout_btn")
 
 st.sidebar.markdown("---")
 
+with st.sidebar.expander("Model Status"):
+    release = releases.status()
+    st.caption(f"Model release **{release['version']}** (reloads: {release['reloads']})")
+    if release["last_error"]:
+        st.warning(f"New model release rejected, still serving {release['version']}: {release['last_error']}")
+    model_report = pd.DataFrame(registry.report())
+    st.dataframe(model_report[["artifact", "loaded", "load_seconds", "memory_bytes", "mapped_bytes", "error"]],
+                 hide_index=True, use_container_width=True)
+    if model_report["error"].notna().any():
+        st.error("Some model artifacts failed to load; scoring will report the error.")
+
 st.title("Fraud Risk Score Calculator for Car Insurance")
 
 st.markdown("<br>",unsafe_allow_html=True)
 
-# --- DEFINITIVE LIST OF REQUIRED USER INPUT COLUMNS (Including ID/text for context) ---
-REQUIRED_INPUT_COLUMNS = [
-    "months_as_customer", "age", "policy_number", "policy_bind_date", "policy_state",
-    "policy_csl", "policy_deductable", "policy_annual_premium", "umbrella_limit", 
-    "insured_zip", "insured_sex", "insured_education_level", "insured_occupation", 
-    "insured_hobbies", "insured_relationship", "capital-gains", "capital-loss", 
-    "incident_date", "incident_type", "collision_type", "incident_severity", 
-    "authorities_contacted", "incident_state", "incident_city", "incident_location", 
-    "incident_hour_of_the_day", "number_of_vehicles_involved", "property_damage", 
-    "bodily_injuries", "witnesses", "police_report_available", "total_claim_amount", 
-    "injury_claim", "property_claim", "vehicle_claim", "auto_make", "auto_model", 
-    "auto_year", "claim_description"
-    # Note: Engineered features (ratios, flags, daysdiff) are generated by the app, 
-    # but providing them in the CSV (if available) is safe due to the feature recalculation in process_claims_batch.
-]
-# --------------------------------------------------------------------------------------
-
 commented="""
 # --- Helper function for smoke check (UNCHANGED) ---
 def smoke_check():
@@ -105,68 +114,6 @@ selected_model_name = st.sidebar.selectbox(
 selected_model_function = model_options[selected_model_name]"""
 # -----------------------------------
 
-# --- BATCH PROCESSING FUNCTION (UNCHANGED) ---
-
-def process_claims_batch(df_claims: pd.DataFrame, scoring_func: callable) -> pd.DataFrame:
-    """Processes a DataFrame of claims using the selected scoring function."""
-    results = []
-    
-    def calculate_features(row: Dict[str, Any]) -> Dict[str, Any]:
-        
-        # Date Handling
-        try:
-            policy_bind_date = pd.to_datetime(row['policy_bind_date'])
-            incident_date = pd.to_datetime(row['incident_date'])
-            row['daysdiff'] = (incident_date - policy_bind_date).days
-        except:
-            row['daysdiff'] = 0
-
-        # Ratio Handling
-        total_claim = row.get('total_claim_amount', 0)
-        annual_premium = row.get('policy_annual_premium', 0)
-        
-        safe_total = total_claim if total_claim > 0 else 1.0
-        safe_premium = annual_premium if annual_premium > 0 else 1.0
-
-        row['claim_to_premium_ratio'] = total_claim / safe_premium
-        row['injury_ratio'] = row.get('injury_claim', 0) / safe_total
-        row['property_ratio'] = row.get('property_claim', 0) / safe_total
-        row['vehicle_ratio'] = row.get('vehicle_claim', 0) / safe_total
-        
-        # Flag Handling
-        row['police_report_flag'] = 1 if str(row.get('police_report_available')).upper() == "YES" else 0
-        row['property_damage_flag'] = 1 if str(row.get('property_damage')).upper() == "YES" else 0
-        row['authorities_contacted_flag'] = 1 if str(row.get('authorities_contacted')).upper() not in ("NONE", "NAN") else 0
-        row['injury_flag'] = 1 if row.get('bodily_injuries', 0) > 0 else 0
-        row['multiple_vehicles_flag'] = 1 if row.get('number_of_vehicles_involved', 0) > 1 else 0
-        
-        return row
-        
-    df_claims = df_claims.apply(calculate_features, axis=1, result_type='expand')
-    
-    # 2. Score each claim
-    for index, row in df_claims.iterrows():
-        try:
-            claim_dict = row.to_dict()
-            score_output = scoring_func(claim_dict)
-            
-            # Combine original claim data with prediction results
-            results.append({**row, 
-                            "Fraud Risk Score (%)": score_output['fraud_risk_score'] * 100,
-                            "Risk Level": score_output['risk_level'],
-                            "Decision": score_output['decision'],
-                            "Text Suspicion Score (%)": score_output['text_suspicion_score'] * 100,
-                           })
-        except Exception as e:
-            results.append({**row, 
-                            "Fraud Risk Score (%)": None,
-                            "Risk Level": "ERROR",
-                            "Decision": f"Prediction Failed: {str(e)[:50]}...",
-                            "Text Suspicion Score (%)": None,
-                           })
-
-    return pd.DataFrame(results)
-
 # --- APPLICATION INPUT SELECTION (Modified) ---
 input_mode = st.radio(
     "Choose Input Method",
@@ -309,23 +256,8 @@ def single_claim_entry():
     if submitted:
         
         with st.spinner(f"Running..."):
-            try:          
-                safe_total_claim = total_claim_amount if total_claim_amount > 0 else 1.0
-                safe_annual_premium = policy_annual_premium if policy_annual_premium > 0 else 1.0
-
-                claim_to_premium_ratio = total_claim_amount / safe_annual_premium
-                injury_ratio = injury_claim / safe_total_claim
-                property_ratio = property_claim / safe_total_claim
-                vehicle_ratio = vehicle_claim / safe_total_claim
-
-                daysdiff = (incident_date - policy_bind_date).days
-                
-                police_report_flag = 1 if police_report_available == "YES" else 0
-                property_damage_flag = 1 if property_damage == "YES" else 0
-                authorities_contacted_flag = 1 if authorities_contacted != "None" else 0
-                injury_flag = 1 if bodily_injuries > 0 else 0
-                multiple_vehicles_flag = 1 if number_of_vehicles_involved > 1 else 0
-
+            try:
+                # Ratios, flags and daysdiff are added by claim_features.engineer_features when the claim is scored.
                 final_claim_data = {
                     "months_as_customer": months_as_customer, "age": age, "policy_number": policy_number,
                     "policy_bind_date": str(policy_bind_date), "policy_state": policy_state, "policy_csl": policy_csl, 
@@ -342,15 +274,12 @@ def single_claim_entry():
                     "total_claim_amount": total_claim_amount, "injury_claim": injury_claim, "property_claim": property_claim,
                     "vehicle_claim": vehicle_claim, "auto_make": auto_make, "auto_model": auto_model, "auto_year": auto_year,
                     "claim_description": claim_description,
-                    
-                    "claim_to_premium_ratio": claim_to_premium_ratio, "injury_ratio": injury_ratio, 
-                    "property_ratio": property_ratio, "vehicle_ratio": vehicle_ratio, "daysdiff": daysdiff, 
-                    "police_report_flag": police_report_flag, "property_damage_flag": property_damage_flag,
-                    "authorities_contacted_flag": authorities_contacted_flag, "injury_flag": injury_flag,
-                    "multiple_vehicles_flag": multiple_vehicles_flag
                 }
 
-                result = fraudriskscore_ensemble(final_claim_data)
+                # Concurrent form submissions are scored together by the shared micro-batch scheduler.
+                result = get_scheduler().score(final_claim_data)
+                if result['risk_level'] == "ERROR":
+                    raise RuntimeError(result['error'])
                 
                 st.success("Analysis Complete! 🕵️‍♀️")
                 
@@ -360,6 +289,7 @@ def single_claim_entry():
                 col2.metric("Risk Level", result['risk_level'])
                 col3.metric("Text Suspicion Score", f"{result['text_suspicion_score'] * 100:.1f}%",
                             help="The model's suspicion score based on the claim description text.")
+                st.caption(f"Scored with model release {result['model_version']}")
 
                 st.markdown("---")
                 st.subheader("Model Score Comparison")
@@ -379,6 +309,7 @@ def single_claim_entry():
                 st.markdown("<br>", unsafe_allow_html=True)
                 st.write("**Visual Comparison of Scores** ")
                 
+                import matplotlib.pyplot as plt  # deferred: only needed for this chart
                 fig, ax = plt.subplots(figsize=(7, 4))
                 
                 # Highlight the highest score (which determines the final decision)
@@ -407,6 +338,9 @@ def single_claim_entry():
                 st.error(f"An error occurred during prediction:")
                 st.exception(e)
 
+RESULT_MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet",
+                     "arrow": "application/vnd.apache.arrow.file"}
+
 def batch_file_upload():
     commented="""
     st.subheader("Upload Claim Data (CSV)")
@@ -419,40 +353,79 @@ def batch_file_upload():
     # ------------------------------------"""
 
     uploaded_file = st.file_uploader(
-        "Upload a CSV file",
-        type="csv"
+        "Upload a CSV, Parquet or Arrow file",
+        type=["csv", "parquet", "arrow", "feather"]
     )
+    col_format, col_keys = st.columns(2)
+    output_format = col_format.selectbox("Results format", FORMATS, format_func=str.upper)
+    keys_only = col_keys.checkbox("Only key columns + scores", help=f"Keeps {', '.join(DEFAULT_KEY_COLUMNS)} and the score columns")
 
+    queue = get_batch_job_queue()
     if uploaded_file is not None:
-        try:
-            df_claims = pd.read_csv(uploaded_file)
-            #st.success(f"Successfully loaded {len(df_claims)} claims.")
-
-            if len(df_claims) > 0:
-                #st.markdown("### 📊 Batch Analysis Preview")
-                #st.dataframe(df_claims.head())
-                
-                #if st.button(f"Analyze {len(df_claims)} Claims using {selected_model_name}"):
-                    
-                    with st.spinner(f"Running batch analysis on {len(df_claims)} claims..."):
-                        df_results = process_claims_batch(df_claims, fraudriskscore_ensemble)
-                        
-                        st.markdown("**RESULTS**")
-                        st.dataframe(df_results)
-                        
-                        # --- Download Option ---
-                        csv_output = df_results.to_csv(index=False).encode('utf-8')
-                        
-                        st.download_button(
-                            label="Download The Results as CSV",
-                            data=csv_output,
-                            file_name=f'fraud_analysis_results_{datetime.date.today()}.csv',
-                            mime='text/csv',
-                        )
-
-        except Exception as e:
-            st.error(f"Error processing the uploaded file. Please check file format and columns.")
-            st.exception(e)
+        # Each upload (with its output options) is submitted once; reruns of the script only poll the job.
+        upload_id = (getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size),
+                     output_format, keys_only)
+        if st.session_state.get("batch_upload_id") != upload_id:
+            try:
+                # The same bytes with the same options and models (e.g. re-uploaded after switching
+                # input mode, or by another user) reuse the earlier job instead of being scored again.
+                key_columns = DEFAULT_KEY_COLUMNS if keys_only else None
+                content_key = job_content_key(uploaded_file, detect_format(uploaded_file.name), output_format,
+                                              key_columns)
+                job_id = queue.find(content_key)
+                reused = job_id is not None
+                if not reused:
+                    job_id = queue.submit(uploaded_file, filename=uploaded_file.name, output_format=output_format,
+                                          key_columns=key_columns, content_key=content_key)
+            except Exception as e:
+                st.error(f"Error processing the uploaded file. Please check file format and columns.")
+                st.exception(e)
+                return
+            st.session_state.batch_upload_id = upload_id
+            st.session_state.batch_job_id = job_id
+            st.session_state.batch_job_reused = reused
+            st.query_params["job"] = job_id
+
+    # The job ID is kept in the URL too, so a reopened tab finds a running or finished job.
+    job_id = st.session_state.get("batch_job_id") or st.query_params.get("job")
+    job = queue.get(job_id) if job_id else None
+    if job is None:
+        return
+
+    st.caption(f"Batch job `{job_id}`" + (f" — {job['filename']}" if job["filename"] else ""))
+    if st.session_state.get("batch_job_reused") and st.session_state.get("batch_job_id") == job_id:
+        st.info("♻️ This file was already scored with the same options and models: showing the cached results.")
+    if job["status"] in (QUEUED, RUNNING):
+        progress_bar = st.progress(0.0, text="Running batch analysis...")
+        while job["status"] in (QUEUED, RUNNING):
+            label = "Waiting for a batch worker..." if job["status"] == QUEUED else \
+                f"Running batch analysis... {job['rows_done']} claims scored"
+            progress_bar.progress(job["fraction"], text=label)
+            time.sleep(0.5)
+            job = queue.get(job_id)
+        progress_bar.empty()
+
+    if job["status"] == FAILED:
+        st.error(f"Error processing the uploaded file. Please check file format and columns.")
+        st.code(job["error"])
+        return
+
+    if job["rows_done"] > 0:
+        preview = queue.preview(job_id)
+        st.markdown("**RESULTS**")
+        if job["rows_done"] > len(preview):
+            st.caption(f"Showing the first {len(preview)} of {job['rows_done']} scored claims. "
+                       "Download the results for the full table.")
+        st.dataframe(preview)
+
+        # --- Download Option ---
+        result_format = job["output_format"]
+        st.download_button(
+            label=f"Download The Results as {result_format.upper()}",
+            data=queue.result_bytes(job_id),
+            file_name=f'fraud_analysis_results_{datetime.date.today()}.{result_format}',
+            mime=RESULT_MIME_TYPES[result_format],
+        )
             
 if input_mode == 'Batch File Upload':
     batch_file_upload()
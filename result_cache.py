@@ -0,0 +1,115 @@
+import os, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# --- Cache settings (environment overrides) ---
+MAX_ENTRIES = int(os.environ.get("FRAUD_RESULT_CACHE_SIZE", "10000"))  # 0 disables the cache
+TTL_SECONDS = float(os.environ.get("FRAUD_RESULT_CACHE_TTL", "3600"))
+# How often (seconds) the version function is re-evaluated (it stats the artifact files).
+CHECK_SECONDS = float(os.environ.get("FRAUD_RESULT_CACHE_CHECK_SECONDS", "1"))
+
+
+class ResultCache:
+    """Bounded LRU of scoring results with a time-to-live.
+
+    Entries expire ttl_seconds after they were stored. With max_bytes, the
+    least recently used entries are also evicted while the sizes reported by
+    size_fn add up to more than max_bytes (a value larger than that on its own
+    is not stored). version_fn returns a
+    token describing the models and thresholds; it is re-read at most every
+    check_seconds and the whole cache is dropped when it changes, so results
+    from replaced artifacts are never served. Callers should mix `version`
+    into their keys as well.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS,
+                 version_fn: Optional[Callable[[], str]] = None, check_seconds: float = CHECK_SECONDS,
+                 max_bytes: int = 0, size_fn: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl_seconds = float(ttl_seconds)
+        self.version_fn = version_fn
+        self.check_seconds = float(check_seconds)
+        self.max_bytes = max(int(max_bytes), 0)  # 0 = no size bound
+        self.size_fn = size_fn
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._checked_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def version(self) -> str:
+        """Current model/threshold version; clears the cache when it has changed."""
+        now = time.monotonic()
+        if self.version_fn is not None and now - self._checked_at >= self.check_seconds:
+            version = self.version_fn()
+            with self._lock:
+                if self._version is not None and version != self._version:
+                    self._entries.clear()
+                    self._bytes = 0
+                    self.invalidations += 1
+                self._version, self._checked_at = version, now
+        return self._version or ""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Iterable[Hashable]) -> List[Optional[Any]]:
+        now = time.monotonic()
+        out = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    self._bytes -= entry[2]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    out.append(entry[1])
+        return out
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items:
+                size = int(self.size_fn(value)) if self.size_fn is not None else 0
+                if self.max_bytes and size > self.max_bytes:
+                    continue
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[2]
+                self._entries[key] = (expires, value, size)
+                self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "bytes": self._bytes, "max_bytes": self.max_bytes, "ttl_seconds": self.ttl_seconds, "hits": self.hits, "misses": self.misses,
+                    "invalidations": self.invalidations, "version": self._version}
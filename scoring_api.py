@@ -0,0 +1,69 @@
+"""Headless HTTP scoring service.
+
+Run with e.g. ``uvicorn scoring_api:app --host 0.0.0.0 --port 8000 --workers 4``.
+Every worker loads the models once (in the background at startup), swaps
+in new model releases without a restart (see model_releases) and
+micro-batches /score requests that arrive close together into one
+score_claims call (see microbatch.MicroBatchScheduler).
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+from fastapi import Body, FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fraudriskscore_final import registry, releases, score_claims
+from instrumentation import render_prometheus
+from microbatch import get_scheduler
+
+scheduler = get_scheduler()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry.warm_in_background()
+    releases.watch()
+    yield
+
+
+app = FastAPI(title="Fraud Risk Score API", lifespan=lifespan)
+
+
+@app.post("/score")
+async def score(claim: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    """Scores one claim (raw claim fields; engineered features are computed server-side)."""
+    return await scheduler.submit(claim)
+
+
+@app.post("/score/batch")
+async def score_batch_endpoint(claims: List[Dict[str, Any]] = Body(...)) -> List[Dict[str, Any]]:
+    """Scores a list of claims in one call; results are returned in request order."""
+    return await run_in_threadpool(score_claims, claims)
+
+
+@app.get("/health")
+async def health() -> Dict[str, str]:
+    """Liveness: the process is up (models may still be loading)."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness: 200 once every model artifact is loaded, 503 while warming (or if a load failed).
+
+    New model releases are loaded before they go live, so a reload never makes a ready worker unready.
+    """
+    warm = registry.is_warm()
+    body = {"ready": warm, "release": releases.status(), "artifacts": registry.report()}
+    return JSONResponse(body, status_code=200 if warm else 503)
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus text: micro-batching histograms, plus per-stage timings when FRAUD_INSTRUMENTATION=1."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/microbatch")
+async def microbatch_metrics() -> Dict[str, Any]:
+    """Micro-batching queue-depth and batch-size histograms as JSON."""
+    return scheduler.metrics()
@@ -0,0 +1,30 @@
+import os
+import time
+
+import pandas as pd
+
+import batch_jobs
+from batch_jobs import DONE, JobQueue
+
+
+def _fake_scores(chunk: pd.DataFrame) -> pd.DataFrame:
+    return chunk.assign(**{"Fraud Risk Score": 0.1, "Risk Level": "Low", "Decision": "Approve Automatically."})
+
+
+def test_running_queue_deletes_expired_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_jobs, "process_claims_batch", _fake_scores)
+    source = tmp_path / "claims.csv"
+    pd.DataFrame({"policy_number": [1, 2, 3]}).to_csv(source, index=False)
+    queue = JobQueue(jobs_dir=str(tmp_path / "jobs"), retention_seconds=0.5, cleanup_seconds=0.1)
+
+    job_id = queue.submit(str(source), "claims.csv")
+    assert queue.wait(job_id, timeout=30)["status"] == DONE
+    assert os.path.exists(queue.result_path(job_id))
+
+    # No restart and no new submission: the running workers expire the job on their own.
+    deadline = time.monotonic() + 30
+    while queue.get(job_id) is not None and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert queue.get(job_id) is None
+    assert not os.path.exists(queue.job_dir(job_id))
+    assert all(thread.is_alive() for thread in queue._threads)
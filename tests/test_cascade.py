@@ -0,0 +1,107 @@
+"""The cascade (FRAUD_ENSEMBLE_CASCADE) must give the same risk tier as evaluating every model.
+
+The models are stand-ins whose probabilities are set per row, so the claims can
+sit right at the thresholds, at the rounding boundaries and on ties.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fraudriskscore_final as frs
+from model_registry import ModelRegistry
+from model_releases import Release
+
+
+class FixedModel:
+    """predict_proba returning a preset probability per row_id."""
+
+    def __init__(self, probas: np.ndarray):
+        self.probas = probas
+
+    def predict_proba(self, frame: pd.DataFrame) -> np.ndarray:
+        p = self.probas[frame["row_id"].to_numpy()]
+        return np.column_stack([1.0 - p, p])
+
+
+# The shipped thresholds, and a set where the first model of the cascade has the lowest high risk limit.
+THRESHOLD_SETS = {
+    "default": dict(frs.DEFAULT_MODEL_THRESHOLDS),
+    "cheapest-lowest": {"RFC": (0.5, 0.9), "LR": (0.2, 0.4), "GBC": (0.3, 0.8)},
+}
+
+
+def _boundary_values(thresholds: dict) -> list:
+    """Probabilities around every threshold and high risk limit (and their 4-decimal rounding), plus extremes."""
+    values = {0.0, 0.99999, 1.0}
+    for limits in thresholds.values():
+        for limit in limits:
+            values.update(limit + delta for delta in (-5e-5, -1e-5, 0.0, 4.9e-5, 1.5e-4))
+    return sorted(values)
+
+
+def _grid(thresholds: dict) -> np.ndarray:
+    """(rows, models) probabilities: every combination of boundary values, exact ties and random claims."""
+    rows = list(itertools.product(_boundary_values(thresholds), repeat=len(frs.ENSEMBLE_ORDER)))
+    for _, limit in thresholds.values():
+        rows += [(limit, limit, limit), (limit + 4e-5, limit, limit - 4e-5), (limit - 4e-5, limit, limit + 4e-5)]
+    rng = np.random.default_rng(7)
+    rows += [tuple(r) for r in rng.random((500, len(frs.ENSEMBLE_ORDER)))]
+    return np.clip(np.array(rows, dtype=float), 0.0, 1.0)
+
+
+@pytest.fixture(params=sorted(THRESHOLD_SETS))
+def probas(request):
+    """Grid of model probabilities, served by a pinned release with stand-in models and the thresholds."""
+    thresholds = THRESHOLD_SETS[request.param]
+    probas = _grid(thresholds)
+    registry = ModelRegistry()
+    for j, name in enumerate(frs.ENSEMBLE_ORDER):
+        registry.register(frs.ENSEMBLE_ARTIFACTS[name], lambda model=FixedModel(probas[:, j]): model)
+    token = frs.releases.pin(Release("test", registry.base_dir, registry, thresholds, 0.2, {}))
+    yield probas
+    frs.releases._pinned.reset(token)
+
+
+def _frame(rows: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({"row_id": rows})
+
+
+def test_cascade_matches_full_ensemble_tiers(probas):
+    frame = _frame(np.arange(len(probas)))
+    no_failures = np.zeros(len(probas), dtype=bool)
+
+    full, full_errors = frs._score_frame_isolating(frame)
+    cascade, cascade_errors = frs._score_frame_cascade(frame)
+    assert full_errors == cascade_errors == [None] * len(probas)
+
+    full_rounded, full_best, full_tier = frs._max_score_selection(full, no_failures)
+    rounded, best, tier = frs._max_score_selection(cascade, no_failures)
+    np.testing.assert_array_equal(tier, full_tier)
+
+    rows = np.arange(len(probas))
+    score, full_score = rounded[rows, best], full_rounded[rows, full_best]
+    # A skipped model may only have scored higher within the same (High) tier.
+    assert (score <= full_score).all()
+    complete = ~np.isnan(cascade).any(axis=1)
+    np.testing.assert_array_equal(score[complete], full_score[complete])
+    np.testing.assert_array_equal(best[complete], full_best[complete])
+    # Both the settled and the fully evaluated paths are exercised.
+    assert complete.any() and not complete.all()
+
+
+def test_single_claim_cascade_matches_full_ensemble(probas):
+    for row in range(0, len(probas), 97):
+        prepared = frs.PreparedClaim(_frame(np.array([row])), 0.0)
+        full = dict(zip(frs.ENSEMBLE_ORDER, frs._score_models({}, prepared)))
+        cascade = frs._score_models_cascade({}, prepared)
+
+        def top(results):
+            return max((results[n] for n in frs.ENSEMBLE_ORDER if n in results), key=lambda r: r["fraud_risk_score"])
+
+        assert (top(cascade)["risk_level"], top(cascade)["decision"]) == (top(full)["risk_level"], top(full)["decision"]), row
+        for name, result in cascade.items():
+            assert result == full[name], (row, name)
+        if len(cascade) == len(full):
+            assert top(cascade) == top(full), row
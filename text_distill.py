@@ -0,0 +1,115 @@
+"""Hashed n-gram text model distilled from the MiniLM text suspicion scorer.
+
+    python text_distill.py train --csv claims.csv --stage ./next-release [--text-column claim_description]
+    python model_releases.py publish ./next-release --version 2026-10-18
+
+Cleans the descriptions, scores them with the current backend (MiniLM
+embeddings + text_model, the "teacher"), and fits a hashed word/char n-gram
+TF-IDF ridge regression to the teacher's scores on the logit scale. The
+result is written to text_model_hashed.joblib in --stage, a copy of the live
+release (never the live release itself), to be published as a new release;
+select it with FRAUD_TEXT_BACKEND=hashed. The vectorizers are stateless hashes
+(no vocabulary to fit or ship), and scoring needs neither torch nor
+sentence_transformers.
+"""
+import argparse, json, os, sys
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from scipy.special import expit, logit
+
+N_FEATURES = 2 ** 16
+# Teacher scores are clipped away from 0/1 before taking the logit.
+SCORE_EPSILON = 1e-4
+
+
+def build_model(n_features: int = N_FEATURES, alpha: float = 1.0) -> Any:
+    """Unfitted regressor: (word 1-2 grams + char 3-5 grams) -> TF-IDF -> Ridge on logit(score)."""
+    from sklearn.compose import TransformedTargetRegressor
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import FeatureUnion, Pipeline
+
+    features = FeatureUnion([
+        ("word", HashingVectorizer(analyzer="word", ngram_range=(1, 2), n_features=n_features,
+                                   alternate_sign=False, norm=None)),
+        ("char", HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features,
+                                   alternate_sign=False, norm=None)),
+    ])
+    pipeline = Pipeline([
+        ("features", features),
+        ("tfidf", TfidfTransformer(sublinear_tf=True)),
+        ("ridge", Ridge(alpha=alpha, solver="lsqr")),
+    ])
+    return TransformedTargetRegressor(regressor=pipeline, func=logit, inverse_func=expit, check_inverse=False)
+
+
+def fit(cleaned: List[str], scores: np.ndarray, alpha: float = 1.0) -> Any:
+    model = build_model(alpha=alpha)
+    model.fit(cleaned, np.clip(np.asarray(scores, dtype=float), SCORE_EPSILON, 1.0 - SCORE_EPSILON))
+    return model
+
+
+def agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+    """How closely candidate scores follow the reference Text Suspicion Scores."""
+    reference, candidate = np.asarray(reference, dtype=float), np.asarray(candidate, dtype=float)
+    diff = np.abs(reference - candidate)
+    out = {
+        "texts": int(len(diff)),
+        "mae": round(float(diff.mean()), 5) if len(diff) else None,
+        "max_abs_diff": round(float(diff.max()), 5) if len(diff) else None,
+        "within_0.05": round(float((diff <= 0.05).mean()), 4) if len(diff) else None,
+        "rounded_equal": round(float((np.round(reference, 4) == np.round(candidate, 4)).mean()), 4) if len(diff) else None,
+    }
+    if len(diff) > 1 and reference.std() > 0 and candidate.std() > 0:
+        out["pearson"] = round(float(np.corrcoef(reference, candidate)[0, 1]), 4)
+        out["spearman"] = round(float(pd.Series(reference).corr(pd.Series(candidate), method="spearman")), 4)
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("--csv", required=True, help="claims CSV with free-text descriptions")
+    parser.add_argument("--text-column", default=None, help="description column (default: first of TEXT_KEYS present)")
+    parser.add_argument("--holdout", type=float, default=0.1, help="fraction of distinct texts held out for the report")
+    parser.add_argument("--alpha", type=float, default=1.0, help="ridge regularization")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stage", required=True, help="directory of the new release: a copy of the live release "
+                                                      "(created when missing) that the model is written to")
+    args = parser.parse_args(argv)
+
+    import joblib
+    import fraudriskscore_final as frs
+    if frs.TEXT_BACKEND == "hashed":
+        parser.error("the teacher scores come from the MiniLM backend: unset FRAUD_TEXT_BACKEND=hashed")
+
+    claims = pd.read_csv(args.csv)
+    texts = claims[args.text_column].tolist() if args.text_column else frs._extract_texts(claims)
+    cleaned = [c for c in dict.fromkeys(frs.clean_text(t) for t in texts) if c != ""]
+    if not cleaned:
+        parser.error("no non-empty descriptions in the input")
+    teacher = frs._score_texts(cleaned)
+
+    order = np.random.default_rng(args.seed).permutation(len(cleaned))
+    n_holdout = int(len(cleaned) * args.holdout) if len(cleaned) > 1 else 0
+    held, train = order[:n_holdout], order[n_holdout:]
+    model = fit([cleaned[i] for i in train], teacher[train], alpha=args.alpha)
+
+    report: Dict[str, Any] = {"texts": len(cleaned), "train": int(len(train))}
+    if n_holdout:
+        student = np.clip(model.predict([cleaned[i] for i in held]), 0.0, 1.0)
+        report["holdout"] = agreement(teacher[held], student)
+
+    output = frs.stage_release(args.stage)["text_model_hashed"]
+    tmp = output + ".tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, output)
+    report["output"] = output
+    report["publish"] = f"python model_releases.py publish {args.stage} --version <version>"
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())